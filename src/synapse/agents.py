@@ -1,154 +1,319 @@
 """
 Module for Pydantic AI agents used in Synapse.
 
-This module provides pre-configured map and reduce agents with their prompts.
+This module provides the map and reduce prompts and lazily constructed agents
+that use them, so agents that are never run are never built.
 """
 
-from textwrap import dedent
+from functools import cache
 
 from pydantic_ai import Agent
+from pydantic_ai.models import Model, infer_model
 
-from synapse.config import settings
-from synapse.models import Profile
+from synapse.config import get_settings
+from synapse.models import Profile, ProfileCompact, ProfileReview
 
-MAP_SYSTEM_PROMPT = dedent("""
-    You are an expert meeting analyst AI. Your primary task is to meticulously analyze the provided meeting transcript and, for each key individual identified by name, generate structured summary.
+MAP_SYSTEM_PROMPT = """You are an expert meeting analyst AI. Your primary task is to meticulously analyze the provided meeting transcript and, for each key individual identified by name, generate structured summary.
 
-    Key individuals are typically internal team members, core collaborators, or significant external stakeholders who demonstrably:
-    * Actively contributed to discussions (e.g., speaking multiple times, offering substantive points).
-    * Were involved in making or influencing decisions.
-    * Expressed notable opinions or stances relevant to the meeting's objectives.
+Key individuals are typically internal team members, core collaborators, or significant external stakeholders who demonstrably:
+* Actively contributed to discussions (e.g., speaking multiple times, offering substantive points).
+* Were involved in making or influencing decisions.
+* Expressed notable opinions or stances relevant to the meeting's objectives.
 
-    IMPORTANT INSTRUCTIONS FOR IDENTIFYING INDIVIDUALS:
-    1. NAMED SPEAKERS: Prioritize individuals explicitly named in the transcript.
-    2. GENERIC SPEAKER LABELS (e.g., "SPEAKER 1", "SPEAKER_02"):
-        a. ATTEMPT INFERENCE: Try to infer their actual name from the transcript's context. For example, another participant might address them by name ("Thanks, Sarah, for that point, SPEAKER 1..."), or they might introduce themselves ("SPEAKER 3: Hi, it's John from engineering...").
-        b. CONFIDENT INFERENCE: If a name can be confidently inferred for a generic speaker label, generate a summary block for them using the INFERRED name.
-        c. NO CONFIDENT INFERENCE: If a name CANNOT be confidently inferred for a generic speaker label after careful review, DO NOT generate a block for that speaker. They should be discarded for this analysis.
-    3. FOCUS & EXCLUSION: Concentrate on individuals with substantive contributions. Ignore fleeting mentions, individuals who only speak to agree without adding substance, or those who do not meet the "key individual" criteria above.
-""")
+IMPORTANT INSTRUCTIONS FOR IDENTIFYING INDIVIDUALS:
+1. NAMED SPEAKERS: Prioritize individuals explicitly named in the transcript.
+2. GENERIC SPEAKER LABELS (e.g., "SPEAKER 1", "SPEAKER_02"):
+    a. ATTEMPT INFERENCE: Try to infer their actual name from the transcript's context. For example, another participant might address them by name ("Thanks, Sarah, for that point, SPEAKER 1..."), or they might introduce themselves ("SPEAKER 3: Hi, it's John from engineering...").
+    b. CONFIDENT INFERENCE: If a name can be confidently inferred for a generic speaker label, generate a summary block for them using the INFERRED name.
+    c. NO CONFIDENT INFERENCE: If a name CANNOT be confidently inferred for a generic speaker label after careful review, DO NOT generate a block for that speaker. They should be discarded for this analysis.
+3. FOCUS & EXCLUSION: Concentrate on individuals with substantive contributions. Ignore fleeting mentions, individuals who only speak to agree without adding substance, or those who do not meet the "key individual" criteria above.
 
-MAP_USER_MESSAGE_TEMPLATE = dedent("""
-    Analyze the following meeting transcript.
+OUTPUT FORMAT:
+The user message contains one or more meeting transcripts, each enclosed in a <transcript> tag whose filename attribute names the transcript. Analyze each transcript independently.
 
-    For EACH key person you identify (following all criteria and name inference rules in the system message), generate a separate section using the exact format specified below.
-    If, after your analysis, no key persons can be identified according to the instructions, your entire output for this transcript must be *only* the following text and nothing else:
-    "No key persons identified in this transcript."
+For EACH key person you identify in a transcript, generate a separate section using the exact format specified below. A person who appears in several transcripts gets a separate section for each transcript.
+If no key persons can be identified in any of the transcripts, your entire output must be *only* the following text and nothing else:
+"No key persons identified in this transcript."
 
-    Transcript Content:
-    <transcript>
-    {transcript_text}
-    </transcript>
+Repeat this complete structure for EACH identified person:
 
-    Instructions & Output Format (Repeat this complete structure for EACH identified person):
+<structure>
+## Person Identified: [Name Variation Used Most Prominently Here OR Confidently Inferred Name]
 
-    <structure>
-    ## Person Identified: [Name Variation Used Most Prominently Here OR Confidently Inferred Name]
+* **Transcript Source:** `[The exact filename given in the filename attribute of the <transcript> tag the person appears in]`
+* **Date Hint:** `[Fill in YYYY-MM-DD if inferrable from transcript content or metadata, otherwise N/A]`
+* **Other Names Mentioned Here:** `[List other variations of this person's name seen in this transcript, or N/A. If the name was inferred from a generic label, this might be N/A unless other variations of the inferred name also appear.]`
+* **Summary of Contributions/Discussion:**
+    * `[Bulleted list (2-5 key points) or brief paragraph summarizing their most significant statements, questions asked, proposals made, or information shared HERE. Focus on their active contributions to the meeting's objectives.]`
+* **Topics Discussed:** `[List up to 5 key topics/projects mentioned in relation to them HERE, comma-separated; choose the most impactful topics based on discussion length, emphasis, or explicit statements of importance.]`
+* **Decisions Involved In:**
+    * `[Decision 1 summary] (Role Hint: [e.g., Proposed, Supported, Opposed, Agreed to, Questioned, Informed decision-makers, Implemented], Context: [Optional brief, relevant snippet, 1-2 sentences])`
+    * `(List all decisions they were directly involved in HERE, or state None Identified)`
+* **Opinions/Stances Expressed:**
+    * `Topic: [Topic 1] - Stance: [Summary of stance expressed HERE] (Context: [Optional brief, relevant snippet, 1-2 sentences])`
+    * `(List all clearly expressed opinions/stances HERE, or state None Identified)`
+* **Interactions with Others:**
+    * `Interacted with: [Other Person Name Variation] regarding "[Interaction Topic]". Type: [e.g., Direct Discussion, Debate, Presentation to, Questioned by, Received input from, Collaborated on task with]. (Context: [Optional brief, relevant snippet, 1-2 sentences])`
+    * `(List all significant interactions HERE, or state None Identified)`
+</structure>
 
-    * **Transcript Source:** `{transcript_filename}`
-    * **Date Hint:** `[Fill in YYYY-MM-DD if inferrable from transcript content or metadata, otherwise N/A]`
-    * **Other Names Mentioned Here:** `[List other variations of this person's name seen in this transcript, or N/A. If the name was inferred from a generic label, this might be N/A unless other variations of the inferred name also appear.]`
-    * **Summary of Contributions/Discussion:**
-        * `[Bulleted list (2-5 key points) or brief paragraph summarizing their most significant statements, questions asked, proposals made, or information shared HERE. Focus on their active contributions to the meeting's objectives.]`
-    * **Topics Discussed:** `[List up to 5 key topics/projects mentioned in relation to them HERE, comma-separated; choose the most impactful topics based on discussion length, emphasis, or explicit statements of importance.]`
-    * **Decisions Involved In:**
-        * `[Decision 1 summary] (Role Hint: [e.g., Proposed, Supported, Opposed, Agreed to, Questioned, Informed decision-makers, Implemented], Context: [Optional brief, relevant snippet, 1-2 sentences])`
-        * `(List all decisions they were directly involved in HERE, or state None Identified)`
-    * **Opinions/Stances Expressed:**
-        * `Topic: [Topic 1] - Stance: [Summary of stance expressed HERE] (Context: [Optional brief, relevant snippet, 1-2 sentences])`
-        * `(List all clearly expressed opinions/stances HERE, or state None Identified)`
-    * **Interactions with Others:**
-        * `Interacted with: [Other Person Name Variation] regarding "[Interaction Topic]". Type: [e.g., Direct Discussion, Debate, Presentation to, Questioned by, Received input from, Collaborated on task with]. (Context: [Optional brief, relevant snippet, 1-2 sentences])`
-        * `(List all significant interactions HERE, or state None Identified)`
-    </structure>
+Ensure all fields accurately reflect information *only* from the transcript named in the section's Transcript Source. Do not add any explanatory text. Do not include triple backticks code blocks in your output. Use Markdown best practices for lists and emphasis. Use `YYYY-MM-DD` for dates."""
 
-    Ensure all fields accurately reflect information *only* from the provided transcript. Do not add any explanatory text. Do not include triple backticks code blocks in your output. Use Markdown best practices for lists and emphasis. Use `YYYY-MM-DD` for dates.
-""")
+MAP_USER_MESSAGE_TEMPLATE = """<transcript filename="{transcript_filename}">
+{transcript_text}
+</transcript>"""
 
-REDUCE_SYSTEM_PROMPT = dedent("""
-    You are an expert Team Dynamics Analyst AI. You will receive a large text payload containing multiple summaries. Each summary describes a person's activity within a single meeting transcript. The same real-world person may appear in multiple summaries with potentially different name variations.
+MAP_GLOSSARY_PREAMBLE = """<glossary>
+Lines repeated across the transcripts below have been replaced by placeholders. Read each placeholder as the line it stands for, and never write a placeholder in your output:"""
 
-    Your core tasks are to:
-    1. Identify each unique person across all summary blocks
-    2. Consolidate information for each person (even when their name varies)
-    3. Generate a comprehensive profile for each significant person
-    4. Include metadata about each person and detailed content sections
+REDUCE_SYSTEM_PROMPT = """You are an expert Team Dynamics Analyst AI. You will receive a large text payload containing multiple summaries. Each summary describes a person's activity within a single meeting transcript, or is an intermediate profile already consolidated from several transcripts. The same real-world person may appear in multiple summaries with potentially different name variations.
 
-    Focus on individuals with significant or recurring activity and filter out minor mentions.
+Your core tasks are to:
+1. Identify each unique person across all summary blocks
+2. Consolidate information for each person (even when their name varies)
+3. Generate a comprehensive profile for each significant person
+4. Include metadata about each person and detailed content sections
 
-    Each profile should consist of:
-    - Structured metadata about the person
-    - Markdown content with comprehensive information including their activity, topics, decisions, stances, and interactions
-""")
+Focus on individuals with significant or recurring activity and filter out minor mentions.
 
-REDUCE_USER_MESSAGE_TEMPLATE = dedent("""
-    Analyze the following text payload. This payload is a concatenation of summaries, each detailing a person's activities from various meeting transcripts.
+Each profile should consist of:
+- Structured metadata about the person
+- Markdown content with comprehensive information including their activity, topics, decisions, stances, and interactions
 
-    Perform entity resolution and synthesis on this aggregated data. Your goal is to generate a detailed profile for each unique key individual identified.
+The user message contains the text payload enclosed in <payload> tags. This payload is a concatenation of summaries, each detailing a person's activities from various meeting transcripts. The payload may be preceded by <aliases> tags; each line there lists name variations that differ only in order, case, accents or punctuation and already refer to the same person.
 
-    Text Payload:
-    <payload>
-    {{CONCATENATED_MARKDOWN_BLOCKS_HERE}}
-    </payload>
+Perform entity resolution and synthesis on this aggregated data. Your goal is to generate a detailed profile for each unique key individual identified.
 
-    Generate a list of profiles of unique persons deemed significant. The Markdown structure for the content field of each profile is defined *within* the `<md>` and `</md>` tags shown below.
+Generate a list of profiles of unique persons deemed significant. The Markdown structure for the content field of each profile is defined *within* the `<md>` and `</md>` tags shown below.
 
-    <md>
-    ## Profile: [Canonical Name - Choose the best, most complete, and formal full name found or synthesized across all provided map outputs and interactions for this individual]
+<md>
+## Profile: [Canonical Name - Choose the best, most complete, and formal full name found or synthesized across all provided map outputs and interactions for this individual]
 
-    ### Overall Summary & Activity:
+### Overall Summary & Activity:
 
-    `[Write a narrative paragraph (approx. 150-250 words) summarizing their key contributions, activities, prevalent stances, and overall involvement across all relevant map outputs. Crucially, include any significant changes or evolution in their role, focus, contributions, or opinions over the active period. If identifiable from dates, highlight their 1-2 most impactful recent activities or contributions.]`
+`[Write a narrative paragraph (approx. 150-250 words) summarizing their key contributions, activities, prevalent stances, and overall involvement across all relevant map outputs. Crucially, include any significant changes or evolution in their role, focus, contributions, or opinions over the active period. If identifiable from dates, highlight their 1-2 most impactful recent activities or contributions.]`
 
-    ### Key Topics & Projects Involved:
+### Key Topics & Projects Involved:
 
-    * `[Synthesize and list the main topics/projects they consistently engage with, drawing from "Topics Discussed" in map outputs. Prioritize topics with repeated engagement or significant contributions.]`
-    * `... (add more topics as needed)`
+* `[Synthesize and list the main topics/projects they consistently engage with, drawing from "Topics Discussed" in map outputs. Prioritize topics with repeated engagement or significant contributions.]`
+* `... (add more topics as needed)`
 
-    ### Consolidated Decisions Involved:
+### Consolidated Decisions Involved:
 
-    * `[Decision Summary] (Role: [Synthesize their most common or impactful role in this decision based on "Role Hint" from map outputs, e.g., Primary Decision Maker, Key Influencer, Proposed Solution, Implemented Decision, Critical Contributor], Date: [Date Hint -<y_bin_46>-MM-DD], Source: [Source Transcript])`
-    * `(List all consolidated decisions they were significantly involved in. State if 'None significant'.)`
+* `[Decision Summary] (Role: [Synthesize their most common or impactful role in this decision based on "Role Hint" from map outputs, e.g., Primary Decision Maker, Key Influencer, Proposed Solution, Implemented Decision, Critical Contributor], Date: [Date Hint - YYYY-MM-DD], Source: [Source Transcript])`
+* `(List all consolidated decisions they were significantly involved in. State if 'None significant'.)`
 
-    ### Key Stances & Opinions:
+### Key Stances & Opinions:
 
-    * **Topic:** `[Topic Name]`
-        * **Stance:** `[Synthesize their stance on this topic across map outputs. If the stance evolves or if there are nuances, describe this, e.g., 'Initially expressed skepticism regarding X (Source: [Source Transcript A], Date:<y_bin_46>-MM-DD), but later supported the revised proposal Y (Source: [Source Transcript B], Date:<y_bin_46>-MM-DD)'. If stance is consistent, state it directly.]` (Key Supporting Source(s): `[e.g., Source Transcript A,<y_bin_46>-MM-DD; Source Transcript C,<y_bin_46>-MM-DD]`)
-    * `(List key stances identified on distinct topics.)`
+* **Topic:** `[Topic Name]`
+    * **Stance:** `[Synthesize their stance on this topic across map outputs. If the stance evolves or if there are nuances, describe this, e.g., 'Initially expressed skepticism regarding X (Source: [Source Transcript A], Date: YYYY-MM-DD), but later supported the revised proposal Y (Source: [Source Transcript B], Date: YYYY-MM-DD)'. If stance is consistent, state it directly.]` (Key Supporting Source(s): `[e.g., Source Transcript A, YYYY-MM-DD; Source Transcript C, YYYY-MM-DD]`)
+* `(List key stances identified on distinct topics.)`
 
-    ### Key Collaborators & Communication:
+### Key Collaborators & Communication:
 
-    * **Frequent Collaborators:**
-        * `[Collaborator Name - Use canonical name if possible by resolving variations from interaction data] (Topics: [List shared topics of discussion/collaboration], Frequency: [Estimate High/Medium/Low based on number of distinct meeting interactions documented in map outputs for this pair])`
-    * **Communication Flow Hints (Optional):**
-        * `[Synthesize observed communication patterns if evident, e.g., "Often discusses technical specifications for Project X with [Collaborator Name]," "Frequently seeks input from [Collaborator Name] on budget matters." State None Observed if not clear.]`
+* **Frequent Collaborators:**
+    * `[Collaborator Name - Use canonical name if possible by resolving variations from interaction data] (Topics: [List shared topics of discussion/collaboration], Frequency: [Estimate High/Medium/Low based on number of distinct meeting interactions documented in map outputs for this pair])`
+* **Communication Flow Hints (Optional):**
+    * `[Synthesize observed communication patterns if evident, e.g., "Often discusses technical specifications for Project X with [Collaborator Name]," "Frequently seeks input from [Collaborator Name] on budget matters." State None Observed if not clear.]`
 
-    ### Potential Blockers/Risks Raised by This Person:
+### Potential Blockers/Risks Raised by This Person:
 
-    * `[List any significant, recurring, or impactful risks, concerns, or blockers this person raised regarding key projects, strategies, or topics. Note the concern, topic, source transcript, and date (YYYY-MM-DD). State None Identified if applicable.]`
-    * `...`
+* `[List any significant, recurring, or impactful risks, concerns, or blockers this person raised regarding key projects, strategies, or topics. Note the concern, topic, source transcript, and date (YYYY-MM-DD). State None Identified if applicable.]`
+* `...`
 
-    ### Key Questions Asked by This Person:
+### Key Questions Asked by This Person:
 
-    * `[List 1-3 recurring or particularly insightful/impactful questions this person asked that drove significant discussion, clarification, or re-evaluation on important topics. Note the question or its summary, the topic, source transcript, and date (YYYY-MM-DD). State None Identified if applicable.]`
-    * `...`
+* `[List 1-3 recurring or particularly insightful/impactful questions this person asked that drove significant discussion, clarification, or re-evaluation on important topics. Note the question or its summary, the topic, source transcript, and date (YYYY-MM-DD). State None Identified if applicable.]`
+* `...`
 
-    ### Observed Strengths/Expertise Areas (Optional):
+### Observed Strengths/Expertise Areas (Optional):
 
-    * `[Based on their contributions, decisions, and how others interact with them across transcripts, synthesize any apparent areas of strength, expertise, or particularly positive influence. E.g., "Demonstrates strong analytical skills in financial discussions," "Effective at mediating disagreements on Topic Z," "Consistently provides practical solutions to engineering challenges." State if not clearly inferable or None Identified.]`
+* `[Based on their contributions, decisions, and how others interact with them across transcripts, synthesize any apparent areas of strength, expertise, or particularly positive influence. E.g., "Demonstrates strong analytical skills in financial discussions," "Effective at mediating disagreements on Topic Z," "Consistently provides practical solutions to engineering challenges." State if not clearly inferable or None Identified.]`
 
-    </md>
+</md>
 
-    Ensure the output strictly follows the Markdown structure defined *within* the `<md>` XML tags above for each person's profile. 
-""")
+Ensure the output strictly follows the Markdown structure defined *within* the `<md>` XML tags above for each person's profile."""
 
-# Initialize the map agent with defaults from settings
-map_agent = Agent(
-    model=settings.map_phase.llm_model,
-    instructions=MAP_SYSTEM_PROMPT,
-)
+PARTIAL_REDUCE_SYSTEM_PROMPT = """You are an expert Team Dynamics Analyst AI. You will receive one portion of a larger text payload containing multiple summaries, enclosed in <payload> tags. The payload may be preceded by <aliases> tags; each line there lists name variations that differ only in order, case, accents or punctuation and already refer to the same person. Each summary describes a person's activity within a single meeting transcript, or is an intermediate profile already consolidated from several transcripts. The same real-world person may appear in multiple summaries with potentially different name variations.
+
+Your output is an intermediate synthesis that will later be merged with the syntheses of the other portions. Your core tasks are to:
+1. Identify each unique person across all summary blocks in this portion
+2. Consolidate information for each person (even when their name varies)
+3. Keep every person with substantive activity in this portion, even if it looks minor here; significance is judged only after all portions are merged
+4. Preserve source transcript names and dates so that the final synthesis can order and attribute events
+
+Each intermediate profile should consist of:
+- The person's canonical name and observed name variations
+- Key topics and short decision summaries
+- Concise Markdown notes covering their activity, stances, and interactions, citing source transcripts and dates"""
+
+VERIFY_REDUCE_SYSTEM_PROMPT = f"""{REDUCE_SYSTEM_PROMPT}
+
+A faster model has already drafted profiles from this payload. The user message contains the draft profiles as JSON inside <draft> tags, followed by the payload. Your task is to verify the draft against the payload rather than rewrite it:
+1. List in accepted_names the canonical name of every draft profile that is accurate, complete and follows the structure above; these are kept exactly as drafted.
+2. For every draft profile that is factually wrong, incomplete, merges different people or splits one person, emit a corrected profile in revised_profiles.
+3. Emit any significant person missing from the draft in revised_profiles.
+4. Omit a draft profile from both lists to drop it.
+
+Do not copy accepted profiles into revised_profiles."""
+
+REDUCE_USER_MESSAGE_TEMPLATE = """<payload>
+{{CONCATENATED_MARKDOWN_BLOCKS_HERE}}
+</payload>"""
 
-# Initialize the reduce agent with defaults from settings and output type
-reduce_agent = Agent(
-    model=settings.reduce_phase.llm_model, instructions=REDUCE_SYSTEM_PROMPT, output_type=list[Profile]
+VERIFY_REDUCE_USER_MESSAGE_TEMPLATE = """<draft>
+{draft_profiles}
+</draft>
+
+<payload>
+{{CONCATENATED_MARKDOWN_BLOCKS_HERE}}
+</payload>"""
+
+
+def _split_template(template: str, *placeholders: str) -> tuple[str, ...]:
+    """Split a template into the literal chunks surrounding each placeholder, in order."""
+    chunks: list[str] = []
+    rest = template
+    for placeholder in placeholders:
+        head, found, rest = rest.partition(placeholder)
+        if not found:
+            raise ValueError(f'Placeholder {placeholder} not found in template')
+        chunks.append(head)
+    chunks.append(rest)
+    return tuple(chunks)
+
+
+# Templates are split once at import so rendering is a single concatenation
+_MAP_USER_MESSAGE_CHUNKS = _split_template(MAP_USER_MESSAGE_TEMPLATE, '{transcript_filename}', '{transcript_text}')
+_REDUCE_USER_MESSAGE_CHUNKS = _split_template(REDUCE_USER_MESSAGE_TEMPLATE, '{{CONCATENATED_MARKDOWN_BLOCKS_HERE}}')
+_VERIFY_REDUCE_USER_MESSAGE_CHUNKS = _split_template(
+    VERIFY_REDUCE_USER_MESSAGE_TEMPLATE, '{draft_profiles}', '{{CONCATENATED_MARKDOWN_BLOCKS_HERE}}'
 )
+
+
+def render_map_user_message(transcript_filename: str, transcript_text: str) -> str:
+    """Render the map user message for a single transcript."""
+    head, middle, tail = _MAP_USER_MESSAGE_CHUNKS
+    return f'{head}{transcript_filename}{middle}{transcript_text}{tail}'
+
+
+def render_map_packed_user_message(
+    transcripts: list[tuple[str, str]], glossary: dict[str, str] | None = None
+) -> str:
+    """
+    Render one map user message for several transcripts.
+
+    Args:
+        transcripts: (filename, text) pairs for the transcripts in the pack
+        glossary: Optional mapping of placeholder to the repeated line it replaces in the transcripts
+
+    Returns:
+        The rendered user message
+    """
+    packed = '\n\n'.join(
+        render_map_user_message(transcript_filename, transcript_text)
+        for transcript_filename, transcript_text in transcripts
+    )
+    if glossary:
+        entries = '\n'.join(f'{placeholder} = {line}' for placeholder, line in glossary.items())
+        packed = f'{MAP_GLOSSARY_PREAMBLE}\n{entries}\n</glossary>\n\n{packed}'
+    return packed
+
+
+def _prepend_alias_hints(message: str, alias_hints: dict[str, list[str]] | None) -> str:
+    """Prefix a reduce user message with an <aliases> block when there are alias hints."""
+    if not alias_hints:
+        return message
+    lines = '\n'.join(f'{name}: {"; ".join(variants)}' for name, variants in alias_hints.items())
+    return f'<aliases>\n{lines}\n</aliases>\n\n{message}'
+
+
+def render_reduce_user_message(map_payload: str, alias_hints: dict[str, list[str]] | None = None) -> str:
+    """
+    Render the reduce user message for a concatenated map output payload.
+
+    Args:
+        map_payload: The concatenated map outputs
+        alias_hints: Optional mapping of a person's name to other variations known to refer to them
+
+    Returns:
+        The rendered user message
+    """
+    head, tail = _REDUCE_USER_MESSAGE_CHUNKS
+    return _prepend_alias_hints(f'{head}{map_payload}{tail}', alias_hints)
+
+
+def render_verify_reduce_user_message(
+    draft_profiles: str, map_payload: str, alias_hints: dict[str, list[str]] | None = None
+) -> str:
+    """
+    Render the verify reduce user message for draft profiles and the map output payload.
+
+    Args:
+        draft_profiles: The draft profiles as JSON
+        map_payload: The concatenated map outputs
+        alias_hints: Optional mapping of a person's name to other variations known to refer to them
+
+    Returns:
+        The rendered user message
+    """
+    head, middle, tail = _VERIFY_REDUCE_USER_MESSAGE_CHUNKS
+    return _prepend_alias_hints(f'{head}{draft_profiles}{middle}{map_payload}{tail}', alias_hints)
+
+
+@cache
+def get_model(model_name: str) -> Model:
+    """Return the model client for `model_name`, shared by every agent that uses it."""
+    return infer_model(model_name)
+
+
+@cache
+def get_map_agent() -> Agent[None, str]:
+    """Return the map agent, constructing it on first use."""
+    return Agent(
+        model=get_model(get_settings().map_phase.llm_model),
+        instructions=MAP_SYSTEM_PROMPT,
+    )
+
+
+@cache
+def get_reduce_agent() -> Agent[None, list[Profile]]:
+    """Return the reduce agent, constructing it on first use."""
+    return Agent(
+        model=get_model(get_settings().reduce_phase.llm_model),
+        instructions=REDUCE_SYSTEM_PROMPT,
+        output_type=list[Profile],
+    )
+
+
+@cache
+def get_draft_reduce_agent() -> Agent[None, list[Profile]]:
+    """Return the agent that drafts final profiles with the cheaper draft model."""
+    draft_llm_model = get_settings().reduce_phase.draft_llm_model
+    if draft_llm_model is None:
+        raise ValueError('reduce_phase.draft_llm_model is not configured')
+    return Agent(
+        model=get_model(draft_llm_model),
+        instructions=REDUCE_SYSTEM_PROMPT,
+        output_type=list[Profile],
+    )
+
+
+@cache
+def get_verify_reduce_agent() -> Agent[None, ProfileReview]:
+    """Return the agent that reviews draft profiles with the reduce model."""
+    return Agent(
+        model=get_model(get_settings().reduce_phase.llm_model),
+        instructions=VERIFY_REDUCE_SYSTEM_PROMPT,
+        output_type=ProfileReview,
+    )
+
+
+@cache
+def get_partial_reduce_agent() -> Agent[None, list[ProfileCompact]]:
+    """Return the agent for intermediate reduces over a portion of the map outputs."""
+    return Agent(
+        model=get_model(get_settings().reduce_phase.llm_model),
+        instructions=PARTIAL_REDUCE_SYSTEM_PROMPT,
+        output_type=list[ProfileCompact],
+    )
@@ -0,0 +1,104 @@
+"""
+Persistent cache for LLM responses.
+
+Map and reduce prompts are deterministic functions of their inputs, so rerunning
+the pipeline over unchanged transcripts would otherwise resend identical requests.
+Responses are stored in a small SQLite database keyed by a hash of the model name
+and every prompt part that went into the request, with the most recently used
+entries also held in memory so repeated lookups within a run skip SQLite.
+Lookups block on disk, so async callers run them in a worker thread; a lock
+serializes access from those threads.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import cache
+from pathlib import Path
+
+from synapse.config import get_settings
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def prompt_cache_key(model: str, *prompt_parts: str) -> str:
+    """
+    Build a cache key for an LLM request.
+
+    Whitespace runs in each prompt part are collapsed before hashing so that
+    trivial re-formatting of a transcript still hits the cache.
+
+    Args:
+        model: The model name the request is sent to
+        *prompt_parts: The system prompt, templates and inputs that make up the request
+
+    Returns:
+        A hex digest identifying the request
+    """
+    digest = hashlib.blake2b(model.encode('utf-8'), digest_size=16)
+    for part in prompt_parts:
+        digest.update(b'\0')
+        digest.update(_WHITESPACE_RE.sub(' ', part).strip().encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PromptCache:
+    """SQLite-backed key/value store for LLM responses with an in-memory LRU tier."""
+
+    def __init__(self, path: Path, memory_maxsize: int = 4096):
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_maxsize = memory_maxsize
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """Return the stored response for `key`, or None on a miss."""
+        with self._lock:
+            if (value := self._memory.get(key)) is not None:
+                self._memory.move_to_end(key)
+                return value
+            row = self._conn.execute('SELECT value FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store `value` as the response for `key`."""
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)', (key, value))
+            self._conn.commit()
+            self._remember(key, value)
+
+    def delete(self, key: str) -> None:
+        """Drop the stored response for `key`, e.g. one that no longer parses."""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._conn.commit()
+            self._memory.pop(key, None)
+
+    def _remember(self, key: str, value: str) -> None:
+        """Hold `value` in the in-memory tier, evicting the least recently used entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_maxsize:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@cache
+def get_prompt_cache() -> PromptCache | None:
+    """Return the shared response cache, or None when caching is disabled."""
+    settings = get_settings()
+    if not settings.processing.cache_enabled:
+        return None
+    return PromptCache(Path(settings.processing.cache_dir).expanduser() / 'responses.sqlite3')
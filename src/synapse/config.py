@@ -9,14 +9,29 @@ or in a .env file:
 - SYNAPSE_MAP_PHASE__INPUT_TRANSCRIPTS_DIR: Directory for transcript files
 - SYNAPSE_MAP_PHASE__OUTPUT_MAP_DIR: Directory for map phase outputs
 - SYNAPSE_MAP_PHASE__LLM_MODEL: LLM model for map phase
+- SYNAPSE_MAP_PHASE__SKIP_UP_TO_DATE: Skip transcripts whose map output is newer than the transcript
+- SYNAPSE_MAP_PHASE__MAX_TRANSCRIPT_TOKENS: Token budget above which a transcript is split across map requests
+- SYNAPSE_MAP_PHASE__PACK_MAX_TOKENS: Token budget for packing small transcripts into one map request
+- SYNAPSE_MAP_PHASE__PACK_MAX_TRANSCRIPTS: Maximum number of transcripts in one packed map request
+- SYNAPSE_MAP_PHASE__PACK_GLOSSARY: Replace repeated boilerplate lines in packed requests with placeholders
 - SYNAPSE_REDUCE_PHASE__OUTPUT_PROFILES_DIR: Directory for profile output files
+- SYNAPSE_REDUCE_PHASE__MAX_PAYLOAD_TOKENS: Token budget for a single reduce request
+- SYNAPSE_REDUCE_PHASE__MAX_FANOUT: Maximum map outputs per reduce request
+- SYNAPSE_REDUCE_PHASE__DRAFT_LLM_MODEL: Cheaper model that drafts final profiles for verification
 - SYNAPSE_PROCESSING__CONCURRENCY: Maximum concurrent processes
+- SYNAPSE_PROCESSING__CACHE_ENABLED: Reuse stored LLM responses for identical prompts
+- SYNAPSE_PROCESSING__CACHE_DIR: Directory for the persistent LLM response cache
+- SYNAPSE_PROCESSING__MAX_RETRIES: Retries for rate-limited or transient LLM errors
+- SYNAPSE_PROCESSING__RETRY_MAX_WAIT: Maximum backoff in seconds between retries
+- SYNAPSE_PROCESSING__TOKENS_PER_MINUTE: Client-side limit on estimated LLM tokens sent per minute
 
 Environment variables use double underscores (__) for nested config sections.
 Environment variables take precedence over values defined in the .env file.
 """
 
-from pydantic import BaseModel, Field
+from functools import cache
+
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import (
     BaseSettings,
     SettingsConfigDict,
@@ -31,6 +46,8 @@ class MapPhaseConfig(BaseModel):
     including input/output directories and LLM model specification.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     llm_model: str = Field(
         default='google-gla:gemini-2.5-flash-preview-04-17', description='LLM model to use for processing'
     )
@@ -38,6 +55,25 @@ class MapPhaseConfig(BaseModel):
         default='./transcripts_sample', description='Directory containing input .txt transcripts'
     )
     output_map_dir: str = Field(default='./map_outputs', description='Directory to save the map phase .md outputs')
+    skip_up_to_date: bool = Field(
+        default=False, description='Skip transcripts whose map output is at least as new as the transcript'
+    )
+    max_transcript_tokens: int = Field(
+        default=0,
+        ge=0,
+        description='Estimated token budget above which a transcript is split across several map requests (0 disables)',
+    )
+    pack_max_tokens: int = Field(
+        default=0,
+        ge=0,
+        description='Estimated token budget for packing several small transcripts into one map request (0 disables)',
+    )
+    pack_max_transcripts: int = Field(
+        default=0, ge=0, description='Maximum number of transcripts packed into one map request (0 for no limit)'
+    )
+    pack_glossary: bool = Field(
+        default=False, description='Replace lines repeated across packed transcripts with glossary placeholders'
+    )
 
 
 class ReducePhaseConfig(BaseModel):
@@ -45,15 +81,32 @@ class ReducePhaseConfig(BaseModel):
     Configuration specific to the reduce phase.
 
     This model defines settings for combining map outputs into the final synthesized
-    profiles, including output location and LLM model specification.
+    profiles, including output location, LLM model specification and the limits
+    above which the reduce is split into partial reduces.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     output_profiles_dir: str = Field(
         default='./profiles', description='Directory to save individual profile Markdown files'
     )
     llm_model: str = Field(
         default='google-gla:gemini-2.5-flash-preview-04-17', description='LLM model to use for processing'
     )
+    draft_llm_model: str | None = Field(
+        default=None,
+        description='Cheaper LLM model that drafts final profiles for the reduce model to verify, or None to disable',
+    )
+    max_payload_tokens: int = Field(
+        default=500_000,
+        description='Estimated token budget for map outputs sent in a single reduce request',
+        ge=1,
+    )
+    max_fanout: int = Field(
+        default=0,
+        description='Maximum number of map outputs per reduce request, or 0 to split on the token budget only',
+        ge=0,
+    )
 
 
 class ProcessingConfig(BaseModel):
@@ -61,14 +114,25 @@ class ProcessingConfig(BaseModel):
     Configuration for processing parameters.
 
     This model defines general processing settings that apply to both map and reduce
-    phases, such as concurrency limits.
+    phases, such as concurrency limits and response caching.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     concurrency: int = Field(
         default=10,
         description='Maximum number of concurrent processing tasks',
         ge=1,  # Ensures concurrency is at least 1
     )
+    cache_enabled: bool = Field(default=False, description='Reuse stored LLM responses for identical prompts')
+    cache_dir: str = Field(default='~/.cache/synapse', description='Directory for the persistent LLM response cache')
+    max_retries: int = Field(default=5, ge=0, description='Maximum retries for rate-limited or transient LLM errors')
+    retry_max_wait: float = Field(
+        default=60.0, gt=0, description='Upper bound in seconds on the backoff between retries'
+    )
+    tokens_per_minute: int = Field(
+        default=0, ge=0, description='Estimated LLM tokens to send per minute across all requests (0 for no limit)'
+    )
 
 
 class SynapseSettings(BaseSettings):
@@ -91,7 +155,12 @@ class SynapseSettings(BaseSettings):
         case_sensitive=False,
         extra='ignore',
         env_prefix='SYNAPSE_',
+        frozen=True,
+        validate_default=False,
     )
 
 
-settings = SynapseSettings()
+@cache
+def get_settings() -> SynapseSettings:
+    """Return the application settings, loading them from the environment on first use."""
+    return SynapseSettings()
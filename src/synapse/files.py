@@ -0,0 +1,94 @@
+"""
+Directory scanning helpers.
+
+The map and reduce phases enumerate input directories that can hold thousands
+of files. `pathlib` globbing builds a `Path` and runs `fnmatch` for every entry;
+a single `os.scandir` pass with a suffix check does the same job with far less
+per-entry work and runs in one worker thread.
+"""
+
+import os
+
+import trio
+from trio import Path
+
+
+def list_files_with_suffix(directory: str, suffix: str) -> list[str]:
+    """
+    List the regular files in a directory whose names end with `suffix`.
+
+    Args:
+        directory: The directory to scan (not recursive)
+        suffix: The filename suffix to match, e.g. '.txt'
+
+    Returns:
+        Paths of the matching files, as strings joined onto `directory`
+    """
+    with os.scandir(directory) as entries:
+        return [
+            os.path.join(directory, entry.name)
+            for entry in entries
+            if entry.name.endswith(suffix) and entry.is_file()
+        ]
+
+
+def has_file_with_suffix(directory: str, suffix: str) -> bool:
+    """Return True as soon as `directory` is found to contain a file ending with `suffix`."""
+    with os.scandir(directory) as entries:
+        return any(entry.name.endswith(suffix) and entry.is_file() for entry in entries)
+
+
+def is_up_to_date(source_path: str | os.PathLike[str], target_path: str | os.PathLike[str]) -> bool:
+    """Return True if `target_path` exists and was modified no earlier than `source_path`."""
+    try:
+        return os.stat(target_path).st_mtime_ns >= os.stat(source_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def read_text_files(file_paths: list[str]) -> list[str | Exception]:
+    """
+    Read several UTF-8 text files, capturing per-file errors instead of raising.
+
+    Args:
+        file_paths: The files to read
+
+    Returns:
+        Each file's text, or the exception raised while reading it, in the same order
+    """
+    contents: list[str | Exception] = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                contents.append(f.read().decode('utf-8'))
+        except Exception as e:
+            contents.append(e)
+    return contents
+
+
+async def scan_files(directory: Path, suffix: str) -> list[Path]:
+    """
+    Asynchronously list the files in `directory` whose names end with `suffix`.
+
+    Args:
+        directory: The directory to scan (not recursive)
+        suffix: The filename suffix to match, e.g. '.txt'
+
+    Returns:
+        The matching files
+    """
+    file_paths = await trio.to_thread.run_sync(list_files_with_suffix, os.fspath(directory), suffix)
+    return [Path(file_path) for file_path in file_paths]
+
+
+async def file_sizes(file_paths: list[Path]) -> list[int]:
+    """
+    Asynchronously stat several files in a single worker thread.
+
+    Args:
+        file_paths: The files to measure
+
+    Returns:
+        The size in bytes of each file, in the same order
+    """
+    return await trio.to_thread.run_sync(lambda: [os.stat(file_path).st_size for file_path in file_paths])
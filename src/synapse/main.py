@@ -5,22 +5,22 @@ This module is the entry point for the Synapse application, orchestrating
 the map and reduce phases for analyzing meeting transcripts.
 """
 import enum
+from functools import partial
 
 import logfire
 import trio
 import typer
 from trio import Path
 
-from synapse.config import settings
+from synapse.config import get_settings
 from synapse.exceptions import (
     EmptyInputDirectory,
     FileProcessingError,
     ReducePhaseError,
     SynapseError,
 )
+from synapse.files import has_file_with_suffix, scan_files
 from synapse.logging import configure_logging
-from synapse.processors.map import run_map_phase
-from synapse.processors.reduce import run_reduce_phase
 
 
 class Phase(str, enum.Enum):
@@ -29,48 +29,85 @@ class Phase(str, enum.Enum):
     BOTH = 'both'
 
 
-async def setup_directories() -> tuple[Path, Path, Path]:
-    """Set up directories and return paths needed for processing."""
+# Phases that include each step of the pipeline
+MAP_PHASES = frozenset({Phase.MAP, Phase.BOTH})
+REDUCE_PHASES = frozenset({Phase.REDUCE, Phase.BOTH})
+
+
+async def setup_directories(list_inputs: bool = True) -> tuple[Path, Path, Path, list[Path] | None]:
+    """
+    Set up directories and return the paths and input transcripts needed for processing.
+
+    Args:
+        list_inputs: Whether to return the input transcripts. When False, the input
+            directory is only checked for at least one transcript and None is returned
+            in place of the list.
+    """
+    settings = get_settings()
     input_dir = Path(settings.map_phase.input_transcripts_dir)
     map_output_dir = Path(settings.map_phase.output_map_dir)
     profiles_dir = Path(settings.reduce_phase.output_profiles_dir)
 
     try:
-        await map_output_dir.mkdir(exist_ok=True, parents=True)
-        await profiles_dir.mkdir(exist_ok=True, parents=True)
+        async with trio.open_nursery() as nursery:
+            for dir_path in (map_output_dir, profiles_dir):
+                nursery.start_soon(partial(dir_path.mkdir, exist_ok=True, parents=True))
         logfire.info('Ensured map output directory exists: {dir_path}', dir_path=str(map_output_dir))
         logfire.info('Ensured profiles directory exists: {dir_path}', dir_path=str(profiles_dir))
 
         # Check if input directory has files
-        input_files = [p for p in await input_dir.glob('*.txt')]
-        if not input_files:
+        if list_inputs:
+            input_files = await scan_files(input_dir, '.txt')
+            has_inputs = bool(input_files)
+        else:
+            input_files = None
+            has_inputs = await trio.to_thread.run_sync(has_file_with_suffix, str(input_dir), '.txt')
+        if not has_inputs:
             raise EmptyInputDirectory(f'No .txt files in {input_dir}')
+    except ExceptionGroup as eg:
+        # The nursery wraps mkdir failures; report the first one like any other setup error
+        raise FileProcessingError(f'Error setting up directories: {eg.exceptions[0]}')
     except Exception as e:
         raise FileProcessingError(f'Error setting up directories: {e}')
     
-    return input_dir, map_output_dir, profiles_dir
+    return input_dir, map_output_dir, profiles_dir, input_files
 
 
-async def run_map(check_inputs: bool = True) -> tuple[int, int]:
-    """Run only the map phase."""
+async def run_map(check_inputs: bool = True, input_files: list[Path] | None = None) -> tuple[int, int]:
+    """
+    Run only the map phase.
+
+    Args:
+        check_inputs: Whether to set up directories and check for input transcripts first
+        input_files: Transcripts found by an earlier `setup_directories` call, reused
+            instead of scanning the input directory again
+    """
+    # Imported here so the CLI starts without loading pydantic-ai and the agents
+    from synapse.processors.map import run_map_phase
+
     if check_inputs:
-        await setup_directories()
+        *_, input_files = await setup_directories()
     
     logfire.info('--- Starting Project Synapse: Map Phase ---')
     with logfire.span('run_map_phase'):
-        processed_count, failed_count = await run_map_phase()
+        processed_count, failed_count = await run_map_phase(input_files)
     
-    logfire.info('--- Map Phase Complete ---')
-    logfire.info('Successfully processed: {count}', count=processed_count)
-    logfire.info('Failed to process: {count}', count=failed_count)
+    logfire.info(
+        '--- Map Phase Complete --- processed: {processed_count}, failed: {failed_count}',
+        processed_count=processed_count,
+        failed_count=failed_count,
+    )
     
     return processed_count, failed_count
 
 
 async def run_reduce(check_inputs: bool = True) -> tuple[bool, int]:
     """Run only the reduce phase."""
+    # Imported here so the CLI starts without loading pydantic-ai and the agents
+    from synapse.processors.reduce import run_reduce_phase
+
     if check_inputs:
-        await setup_directories()
+        await setup_directories(list_inputs=False)
     
     logfire.info('--- Starting Project Synapse: Reduce Phase ---')
     try:
@@ -94,23 +131,28 @@ async def main(phase: Phase = Phase.BOTH):
     configure_logging()
     
     # --- Configuration Setup ---
-    input_dir, map_output_dir, profiles_dir = await setup_directories()
+    input_dir, map_output_dir, profiles_dir, input_files = await setup_directories(list_inputs=phase in MAP_PHASES)
     
-    logfire.info('Input directory: {input_dir}', input_dir=str(input_dir))
-    logfire.info('Map output directory: {output_dir}', output_dir=str(map_output_dir))
-    logfire.info('Profiles output directory: {profiles_dir}', profiles_dir=str(profiles_dir))
-    logfire.info('Concurrency limit: {concurrency}', concurrency=settings.processing.concurrency)
-    logfire.info('Using Map LLM model: {model}', model=settings.map_phase.llm_model)
-    logfire.info('Using Reduce LLM model: {model}', model=settings.reduce_phase.llm_model)
-    logfire.info('Running phase: {phase}', phase=phase)
+    settings = get_settings()
+    logfire.info(
+        'Running phase {phase} on {input_dir} (map output: {output_dir}, profiles: {profiles_dir}, '
+        'concurrency: {concurrency}, map model: {map_model}, reduce model: {reduce_model})',
+        phase=phase,
+        input_dir=str(input_dir),
+        output_dir=str(map_output_dir),
+        profiles_dir=str(profiles_dir),
+        concurrency=settings.processing.concurrency,
+        map_model=settings.map_phase.llm_model,
+        reduce_model=settings.reduce_phase.llm_model,
+    )
     # --- End Configuration Setup ---
 
-    if phase in (Phase.MAP, Phase.BOTH):
-        await run_map(check_inputs=False)
+    if phase in MAP_PHASES:
+        await run_map(check_inputs=False, input_files=input_files)
         logfire.info('Map outputs saved to: {output_dir}', output_dir=str(map_output_dir))
         logfire.info('--------------------------')
     
-    if phase in (Phase.REDUCE, Phase.BOTH):
+    if phase in REDUCE_PHASES:
         await run_reduce(check_inputs=False)
 
 
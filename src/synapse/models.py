@@ -26,3 +26,32 @@ class Profile(BaseModel):
 
     metadata: ProfileMetadata = Field(description='The structured metadata for this person')
     content: str = Field(description='Full markdown content of the profile with all sections')
+
+
+class ProfileReview(BaseModel):
+    """Verdict on a set of draft profiles: which to keep as drafted and which to replace."""
+
+    accepted_names: list[str] = Field(
+        default_factory=list, description='Canonical names of draft profiles that are accurate and kept unchanged'
+    )
+    revised_profiles: list[Profile] = Field(
+        default_factory=list[Profile], description='Corrected or newly added profiles that replace or extend the drafts'
+    )
+
+
+class ProfileCompact(BaseModel):
+    """Slim intermediate profile produced by partial reduces and consumed by the next reduce level."""
+
+    canonical_name: str = Field(description='The canonical/best name for this person')
+    aliases: list[str] = Field(
+        default_factory=list, description='List of all name variations observed in transcripts'
+    )
+    topics: list[str] = Field(
+        default_factory=list, description='List of key topics this person discussed or was involved with'
+    )
+    decisions: list[str] = Field(
+        default_factory=list, description='Short summaries of decisions this person was involved in'
+    )
+    markdown: str = Field(
+        description='Markdown notes on this person, including source transcripts and dates for each point'
+    )
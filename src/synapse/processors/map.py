@@ -1,82 +1,411 @@
 """
 Map phase processor for analyzing individual transcripts.
+
+When `map_phase.pack_max_tokens` is set, small transcripts are bin-packed into
+shared map requests so the system prompt, which carries the output
+instructions, is sent once per pack rather than once per transcript. The packed
+response is split back into per-transcript outputs using each section's
+Transcript Source field. Boilerplate lines repeated across the transcripts of a
+pack (agenda headers, email footers) can optionally be replaced by short
+glossary placeholders. Transcripts larger than `map_phase.max_transcript_tokens`
+are split into parts that are mapped separately and their outputs concatenated.
 """
 
+import re
+from collections import Counter
+
 import logfire
 import trio
 from rich.progress import Progress
 from trio import Path
 
-from synapse.agents import MAP_USER_MESSAGE_TEMPLATE, map_agent
-from synapse.config import settings
+from synapse.agents import (
+    MAP_SYSTEM_PROMPT,
+    get_map_agent,
+    render_map_packed_user_message,
+    render_map_user_message,
+)
+from synapse.cache import get_prompt_cache, prompt_cache_key
+from synapse.config import get_settings
+from synapse.files import file_sizes, is_up_to_date, read_text_files, scan_files
+from synapse.retry import run_agent_with_retries
+from synapse.tokens import CHARS_PER_TOKEN
+
+NO_KEY_PERSONS_OUTPUT = 'No key persons identified in this transcript.'
+# Longest output still checked against the sentinel, leaving room for surrounding whitespace
+_NO_KEY_PERSONS_MAX_LENGTH = len(NO_KEY_PERSONS_OUTPUT) + 64
+
+_PERSON_SECTION_RE = re.compile(r'^(?=## Person Identified:)', re.MULTILINE)
+_TRANSCRIPT_SOURCE_RE = re.compile(r'^\* \*\*Transcript Source:\*\*\s*`?([^`\n]*?)`?\s*$', re.MULTILINE)
+
+GLOSSARY_MAX_ENTRIES = 16
+GLOSSARY_MIN_LINE_LENGTH = 40
+
+
+def is_no_key_persons_output(map_output: str) -> bool:
+    """
+    Return True if a map output is just the no-key-persons sentinel.
+
+    Outputs too long to be the sentinel are rejected without stripping them.
+    """
+    return len(map_output) <= _NO_KEY_PERSONS_MAX_LENGTH and map_output.strip() == NO_KEY_PERSONS_OUTPUT
+
+
+def pack_transcripts[T](
+    transcripts: list[tuple[T, int]], max_tokens: int, max_transcripts: int = 0, split_tokens: int = 0
+) -> list[list[T]]:
+    """
+    Group transcripts into as few packs as possible within a token budget.
+
+    Transcripts are placed largest first into the first pack with room left
+    (first-fit decreasing), so small transcripts fill the gaps left beside large
+    ones. A transcript whose own estimate reaches the budget is always sent on its
+    own, and a budget of 0 disables packing entirely. The budget is capped at
+    `split_tokens` so a transcript large enough to be split is never packed and
+    no pack outgrows a single split part.
+
+    Args:
+        transcripts: (transcript, estimated token count) pairs
+        max_tokens: Estimated token budget for the transcripts in one pack
+        max_transcripts: Maximum number of transcripts in one pack (0 for no limit)
+        split_tokens: Token budget above which a transcript is split into parts (0 for no splitting)
+
+    Returns:
+        Packs of transcripts, largest pack contents first
+    """
+    if max_tokens > 0 and split_tokens > 0:
+        max_tokens = min(max_tokens, split_tokens)
+    if max_tokens <= 0:
+        return [[transcript] for transcript, _ in transcripts]
+
+    packs: list[list[T]] = []
+    pack_tokens: list[int] = []
+    for transcript, tokens in sorted(transcripts, key=lambda item: item[1], reverse=True):
+        for index, pack in enumerate(packs):
+            if pack_tokens[index] + tokens <= max_tokens and (not max_transcripts or len(pack) < max_transcripts):
+                pack.append(transcript)
+                pack_tokens[index] += tokens
+                break
+        else:
+            packs.append([transcript])
+            pack_tokens.append(tokens)
+    return packs
+
+
+def split_transcript(transcript_text: str, max_tokens: int) -> list[str]:
+    """
+    Split a transcript into consecutive parts that each fit within a token budget.
+
+    Parts break at line boundaries; a single line longer than the budget is cut
+    into budget-sized pieces. A budget of 0 disables splitting.
+
+    Args:
+        transcript_text: The transcript content
+        max_tokens: Estimated token budget for one part
+
+    Returns:
+        The transcript parts, in order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if max_tokens <= 0 or len(transcript_text) <= max_chars:
+        return [transcript_text]
+
+    parts: list[str] = []
+    current: list[str] = []
+    current_chars = 0
+    for line in transcript_text.splitlines(keepends=True):
+        pieces = [line[i : i + max_chars] for i in range(0, len(line), max_chars)]
+        for piece in pieces:
+            if current and current_chars + len(piece) > max_chars:
+                parts.append(''.join(current).strip())
+                current, current_chars = [], 0
+            current.append(piece)
+            current_chars += len(piece)
+    if current:
+        parts.append(''.join(current).strip())
+    return [part for part in parts if part]
+
+
+def split_packed_map_output(map_output: str, transcript_filenames: list[str]) -> dict[str, str]:
+    """
+    Route the person sections of a packed map response back to their transcripts.
+
+    Args:
+        map_output: The map agent's Markdown output for a packed request
+        transcript_filenames: Filenames of the transcripts included in the request
+
+    Returns:
+        Mapping of transcript filename to its Markdown sections; transcripts without
+        any sections are omitted
+    """
+    sections: dict[str, list[str]] = {}
+    for section in _PERSON_SECTION_RE.split(map_output):
+        section = section.strip()
+        if not section.startswith('## Person Identified:'):
+            continue
+        match = _TRANSCRIPT_SOURCE_RE.search(section)
+        source = match.group(1).strip() if match else ''
+        if source not in transcript_filenames:
+            logfire.warn('Dropping packed map section with unknown transcript source: {source}', source=source)
+            continue
+        sections.setdefault(source, []).append(section)
+    return {filename: '\n\n'.join(parts) for filename, parts in sections.items()}
+
+
+def build_glossary(
+    transcript_texts: list[str],
+    max_entries: int = GLOSSARY_MAX_ENTRIES,
+    min_line_length: int = GLOSSARY_MIN_LINE_LENGTH,
+) -> dict[str, str]:
+    """
+    Choose repeated lines worth replacing with placeholders in a packed request.
+
+    A line qualifies when it occurs more than once across the transcripts and
+    replacing every occurrence saves more characters than its glossary entry costs.
+
+    Args:
+        transcript_texts: The transcripts in the pack
+        max_entries: Maximum number of glossary entries
+        min_line_length: Minimum stripped length of a line to consider
+
+    Returns:
+        Mapping of placeholder (e.g. `$TMPL1$`) to the line it replaces, largest saving first
+    """
+    counts = Counter(
+        stripped
+        for text in transcript_texts
+        for line in text.splitlines()
+        if len(stripped := line.strip()) >= min_line_length
+    )
+    placeholder_length = len(f'$TMPL{max_entries}$')
+    savings = [
+        (saved, line)
+        for line, count in counts.items()
+        if (saved := count * (len(line) - placeholder_length) - (len(line) + placeholder_length + 4)) > 0
+    ]
+    savings.sort(key=lambda item: (-item[0], item[1]))
+    return {f'$TMPL{index}$': line for index, (_, line) in enumerate(savings[:max_entries], start=1)}
+
 
+def apply_glossary(transcript_text: str, glossary: dict[str, str]) -> str:
+    """Replace each line of a transcript that appears in the glossary with its placeholder."""
+    placeholders = {line: placeholder for placeholder, line in glossary.items()}
+    return '\n'.join(placeholders.get(line.strip(), line) for line in transcript_text.splitlines())
 
-async def run_map_phase() -> tuple[int, int]:
+
+async def run_map_agent(user_prompt: str) -> str:
+    """
+    Run the map agent on a prompt, reusing a cached response when available.
+
+    Args:
+        user_prompt: The rendered map user message
+
+    Returns:
+        The map agent's Markdown output
+    """
+    prompt_cache = get_prompt_cache()
+    cache_key = prompt_cache_key(get_settings().map_phase.llm_model, MAP_SYSTEM_PROMPT, user_prompt)
+    # SQLite lookups block, so they run in a worker thread rather than on the event loop
+    cached = await trio.to_thread.run_sync(prompt_cache.get, cache_key) if prompt_cache is not None else None
+    if cached is not None:
+        logfire.info('Map cache hit: {cache_key}', cache_key=cache_key)
+        return cached
+
+    map_output = await run_agent_with_retries(get_map_agent(), user_prompt, MAP_SYSTEM_PROMPT)
+    if prompt_cache is not None:
+        await trio.to_thread.run_sync(prompt_cache.set, cache_key, map_output)
+    return map_output
+
+
+def map_output_path(output_dir: Path, transcript_path: Path) -> Path:
+    """Return the path of a transcript's map output."""
+    return output_dir / f'{transcript_path.stem}.map.md'
+
+
+async def _skip_up_to_date(transcript_paths: list[Path], output_dir: Path) -> list[Path]:
+    """Leave out transcripts already mapped by an earlier run, checking them all in one worker thread."""
+    up_to_date = await trio.to_thread.run_sync(
+        lambda: [is_up_to_date(p, map_output_path(output_dir, p)) for p in transcript_paths]
+    )
+    remaining_paths = [p for p, skip in zip(transcript_paths, up_to_date) if not skip]
+    logfire.info(
+        'Skipping {count} transcripts with up-to-date map outputs', count=len(transcript_paths) - len(remaining_paths)
+    )
+    return remaining_paths
+
+
+async def _plan_transcript_packs(transcript_paths: list[Path]) -> list[list[Path]]:
+    """Order transcripts largest first and group small ones into packs when packing is enabled."""
+    map_settings = get_settings().map_phase
+
+    # Dispatch the largest transcripts first so a long one does not start last and hold up the phase
+    transcript_sizes = await file_sizes(transcript_paths)
+    sized_transcripts = sorted(
+        zip(transcript_paths, (size // CHARS_PER_TOKEN for size in transcript_sizes)),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    if map_settings.pack_max_tokens <= 0:
+        return [[p] for p, _ in sized_transcripts]
+
+    transcript_packs = pack_transcripts(
+        sized_transcripts,
+        map_settings.pack_max_tokens,
+        map_settings.pack_max_transcripts,
+        map_settings.max_transcript_tokens,
+    )
+    logfire.info(
+        'Packed {transcript_count} transcripts into {pack_count} map requests',
+        transcript_count=len(transcript_paths),
+        pack_count=len(transcript_packs),
+    )
+    return transcript_packs
+
+
+async def _save_map_output(output_dir: Path, transcript_path: Path, map_output_content: str) -> None:
+    """Write a transcript's map output unless no key persons were identified."""
+    output_path = map_output_path(output_dir, transcript_path)
+    if map_output_content and not is_no_key_persons_output(map_output_content):
+        await output_path.write_text(map_output_content, encoding='utf-8')
+        logfire.info('Map output saved: {output_path}', output_path=str(output_path))
+    else:
+        logfire.info('No key persons identified in: {filepath}', filepath=str(transcript_path))
+
+
+async def _read_pack(pack: list[Path]) -> list[tuple[Path, str | None]]:
+    """
+    Read a pack's transcripts in one worker thread.
+
+    Empty transcripts come back as an empty string and unreadable ones as None.
+    """
+    contents = await trio.to_thread.run_sync(read_text_files, [str(p) for p in pack])
+    transcripts: list[tuple[Path, str | None]] = []
+    for transcript_path, content in zip(pack, contents):
+        if isinstance(content, Exception):
+            logfire.error(
+                'Error reading transcript {filepath}: {error}',
+                filepath=str(transcript_path),
+                error=str(content),
+                exc_info=content,
+            )
+            transcripts.append((transcript_path, None))
+            continue
+        # isspace() detects blank files in one pass without copying the text the way strip() would
+        if not content or content.isspace():
+            logfire.warn('Skipping empty transcript file: {filepath}', filepath=str(transcript_path))
+            content = ''
+        transcripts.append((transcript_path, content))
+    return transcripts
+
+
+async def _process_transcript(output_dir: Path, transcript_path: Path, transcript_text: str) -> bool:
+    """Process one transcript with its own map request, returning whether it succeeded."""
+    relative_path_str = str(transcript_path)
+    with logfire.span('process_transcript_map', filepath=relative_path_str):
+        try:
+            # Process with the shared map agent, one request per part of an oversized transcript
+            parts = split_transcript(transcript_text, get_settings().map_phase.max_transcript_tokens)
+            if len(parts) > 1:
+                logfire.info(
+                    'Splitting oversized transcript {filepath} into {parts_count} map requests',
+                    filepath=relative_path_str,
+                    parts_count=len(parts),
+                )
+            map_outputs = [
+                (await run_map_agent(render_map_user_message(transcript_path.name, part))).strip() for part in parts
+            ]
+            map_output_content = '\n\n'.join(
+                output for output in map_outputs if output and output != NO_KEY_PERSONS_OUTPUT
+            )
+            await _save_map_output(output_dir, transcript_path, map_output_content)
+            return True
+
+        except Exception as e:
+            logfire.error(
+                'Error processing transcript {filepath}: {error}',
+                filepath=relative_path_str,
+                error=str(e),
+                exc_info=True,
+            )
+            return False
+
+
+async def _process_pack(output_dir: Path, transcripts: list[tuple[Path, str]]) -> bool:
+    """Process several transcripts with a single packed map request, returning whether it succeeded."""
+    pack = [p for p, _ in transcripts]
+    pack_glossary = get_settings().map_phase.pack_glossary
+    with logfire.span('process_transcript_pack_map', filepaths=[str(p) for p in pack]):
+        try:
+            glossary = build_glossary([text for _, text in transcripts]) if pack_glossary else {}
+            user_prompt = render_map_packed_user_message(
+                [(p.name, apply_glossary(text, glossary) if glossary else text) for p, text in transcripts],
+                glossary,
+            )
+            map_outputs = split_packed_map_output(await run_map_agent(user_prompt), [p.name for p in pack])
+            for transcript_path in pack:
+                await _save_map_output(output_dir, transcript_path, map_outputs.get(transcript_path.name, ''))
+            return True
+
+        except Exception as e:
+            logfire.error(
+                'Error processing transcript pack {filepaths}: {error}',
+                filepaths=[str(p) for p in pack],
+                error=str(e),
+                exc_info=True,
+            )
+            return False
+
+
+async def run_map_phase(transcript_paths: list[Path] | None = None) -> tuple[int, int]:
     """
     Processes transcript files concurrently to generate Map phase Markdown outputs.
 
-    Uses configuration from module-level settings.
+    Uses configuration from get_settings().
+
+    Args:
+        transcript_paths: Transcript files to process. When omitted, the configured
+            input directory is scanned for `*.txt` files.
 
     Returns:
         A tuple containing (number_of_files_processed, number_of_files_failed).
     """
-    # Use module-level settings
-    concurrency = settings.processing.concurrency
+    settings = get_settings()
     output_dir = Path(settings.map_phase.output_map_dir)
     input_dir = Path(settings.map_phase.input_transcripts_dir)
 
-    # Get transcript files from the configured input directory
-    transcript_paths = [p for p in await input_dir.glob('*.txt')]
-    logfire.info(f'Found {len(transcript_paths)} transcript files in {input_dir}')
-    processed_stats = {'processed': 0, 'failed': 0}
-    send_channel, receive_channel = trio.open_memory_channel[Path](0)
-
-    async def map_worker(worker_receive_channel: trio.MemoryReceiveChannel[Path]):
-        """Worker task to process one transcript file."""
-        async for transcript_path in worker_receive_channel:
-            relative_path_str = str(transcript_path)
-            output_filename = transcript_path.name.replace('.txt', '.map.md')
-            output_path = output_dir / output_filename
-
-            with logfire.span('process_transcript_map', filepath=relative_path_str):
-                try:
-                    # Read and check transcript content
-                    transcript_text = await transcript_path.read_text(encoding='utf-8')
-                    transcript_text = transcript_text.strip()
-
-                    if not transcript_text:
-                        logfire.warn('Skipping empty transcript file: {filepath}', filepath=relative_path_str)
-                        continue  # Skip empty files
-
-                    # Process with module-level agent
-                    user_prompt = MAP_USER_MESSAGE_TEMPLATE.format(
-                        transcript_text=transcript_text, transcript_filename=transcript_path.name
-                    )
-                    result = await map_agent.run(user_prompt)
-                    map_output_content = result.output
-
-                    # Save output if useful
-                    if (
-                        map_output_content
-                        and map_output_content.strip() != 'No key persons identified in this transcript.'
-                    ):
-                        await output_path.write_text(map_output_content, encoding='utf-8')
-                        logfire.info('Map output saved: {output_path}', output_path=str(output_path))
-                    else:
-                        logfire.info('No key persons identified in: {filepath}', filepath=relative_path_str)
-
-                    processed_stats['processed'] += 1
-
-                except Exception as e:
-                    processed_stats['failed'] += 1
-                    logfire.error(
-                        'Error processing transcript {filepath}: {error}',
-                        filepath=relative_path_str,
-                        error=str(e),
-                        exc_info=True,
-                    )
-                finally:
-                    progress.update(map_task_id, advance=1)
+    # Get transcript files from the configured input directory unless the caller already scanned it
+    if transcript_paths is None:
+        transcript_paths = await scan_files(input_dir, '.txt')
+    logfire.info(
+        'Found {count} transcript files in {input_dir}', count=len(transcript_paths), input_dir=str(input_dir)
+    )
+
+    # Transcripts already mapped by an earlier run count as processed
+    up_to_date_count = 0
+    if settings.map_phase.skip_up_to_date:
+        remaining_paths = await _skip_up_to_date(transcript_paths, output_dir)
+        up_to_date_count = len(transcript_paths) - len(remaining_paths)
+        transcript_paths = remaining_paths
+
+    transcript_packs = await _plan_transcript_packs(transcript_paths)
+
+    # Bounds in-flight map requests; transcripts are read while waiting for a free slot
+    limiter = trio.CapacityLimiter(settings.processing.concurrency)
+
+    # Outcome of each dispatched pack as (transcript count, succeeded), summed once mapping finishes
+    pack_outcomes: list[tuple[int, bool]] = []
+
+    async def map_transcripts(transcripts: list[tuple[Path, str]], borrower: object) -> None:
+        """Process one pack of pre-read transcripts, then free its map slot."""
+        try:
+            if len(transcripts) == 1:
+                succeeded = await _process_transcript(output_dir, *transcripts[0])
+            else:
+                succeeded = await _process_pack(output_dir, transcripts)
+            pack_outcomes.append((len(transcripts), succeeded))
+        finally:
+            limiter.release_on_behalf_of(borrower)
+            progress.update(map_task_id, advance=len(transcripts))
 
     with Progress() as progress:
         map_task_id = progress.add_task('[cyan]Mapping transcripts...', total=len(transcript_paths))
@@ -85,15 +414,22 @@ async def run_map_phase() -> tuple[int, int]:
         await output_dir.mkdir(exist_ok=True, parents=True)
         logfire.info('Ensured output directory exists: {dir_path}', dir_path=str(output_dir))
 
+        unreadable_count = 0
         async with trio.open_nursery() as nursery:
-            # Start workers
-            for _ in range(concurrency):
-                nursery.start_soon(map_worker, receive_channel.clone())
-
-            # Send transcript paths to workers
-            async with send_channel:
-                for path in transcript_paths:
-                    await send_channel.send(path)
-
-    return processed_stats['processed'], processed_stats['failed']
+            for pack in transcript_packs:
+                # Read the next pack while earlier packs are still being mapped
+                transcripts = await _read_pack(pack)
+                unreadable_count += sum(text is None for _, text in transcripts)
+                transcripts = [(p, text) for p, text in transcripts if text]
+                # Empty and unreadable transcripts never occupy a map slot
+                if skipped_count := len(pack) - len(transcripts):
+                    progress.update(map_task_id, advance=skipped_count)
+                if not transcripts:
+                    continue
+                borrower = object()
+                await limiter.acquire_on_behalf_of(borrower)
+                nursery.start_soon(map_transcripts, transcripts, borrower)
 
+    processed_count = up_to_date_count + sum(count for count, succeeded in pack_outcomes if succeeded)
+    failed_count = unreadable_count + sum(count for count, succeeded in pack_outcomes if not succeeded)
+    return processed_count, failed_count
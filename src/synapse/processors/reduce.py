@@ -2,30 +2,66 @@
 Reduce phase processor for synthesizing information across transcripts.
 
 Note on MapReduce Design:
-    The current implementation uses a simplified reduce approach where all map outputs
-    are concatenated and processed in a single LLM call. This works efficiently with
+    When all map outputs fit within the configured payload budget they are
+    concatenated and processed in a single LLM call, which works well with
     Gemini's 1M context window for moderate-sized datasets.
 
-    For larger datasets where outputs exceed model context limits, a true MapReduce
-    implementation would be needed with:
-    1. Partitioning by person/entity keys
-    2. Parallel reducers for different partitions
-    3. Hierarchical reduction for very large datasets
+    Larger datasets are reduced hierarchically: map outputs are split into
+    contiguous (chronological) groups, each group is reduced concurrently into
+    intermediate profiles, intermediate profiles are merged by name, and the
+    process repeats until the remaining payload fits in one final reduce call.
 
-    The current architecture is designed to be extended to this approach in the future
-    if/when output sizes exceed single-context processing capabilities.
+    When `reduce_phase.draft_llm_model` is set, the final reduce is drafted by
+    that cheaper model and the reduce model only verifies the drafts, re-emitting
+    just the profiles it corrects or adds.
 """
 import re
-from datetime import datetime
+import unicodedata
+from collections import Counter
+from functools import lru_cache
 
 import logfire
+import trio
 import yaml
+from pydantic import TypeAdapter, ValidationError
+from pydantic_ai import Agent
 from trio import Path
 
-from synapse.agents import REDUCE_USER_MESSAGE_TEMPLATE, reduce_agent
-from synapse.config import settings
+from synapse.agents import (
+    PARTIAL_REDUCE_SYSTEM_PROMPT,
+    REDUCE_SYSTEM_PROMPT,
+    REDUCE_USER_MESSAGE_TEMPLATE,
+    VERIFY_REDUCE_SYSTEM_PROMPT,
+    get_draft_reduce_agent,
+    get_partial_reduce_agent,
+    get_reduce_agent,
+    get_verify_reduce_agent,
+    render_reduce_user_message,
+    render_verify_reduce_user_message,
+)
+from synapse.cache import get_prompt_cache, prompt_cache_key
+from synapse.config import get_settings
+from synapse.files import scan_files
+from synapse.models import Profile, ProfileCompact, ProfileReview
+from synapse.retry import run_agent_with_retries
+from synapse.tokens import estimate_tokens
 
+_PROFILE_LIST_ADAPTER = TypeAdapter(list[Profile])
+_COMPACT_PROFILE_LIST_ADAPTER = TypeAdapter(list[ProfileCompact])
 
+_PERSON_HEADING_RE = re.compile(r'^## (?:Person Identified|Intermediate Profile): *(.+?) *$', re.MULTILINE)
+_NAME_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-\.]')
+_MAP_FILE_TIMESTAMP_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2}) (\d{2})_(\d{2})')
+
+# Use libyaml's emitter when PyYAML was built with it
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Upper bound on map output reads or profile writes in flight, well below typical open file limits
+FILE_IO_CONCURRENCY = 32
+
+
+@lru_cache(maxsize=4096)
 def sanitize_filename(name: str) -> str:
     """
     Convert a person's name to a valid filename.
@@ -37,11 +73,20 @@ def sanitize_filename(name: str) -> str:
         A sanitized version of the name suitable for use as a filename
     """
     # Replace spaces with underscores and remove any characters not allowed in filenames
-    sanitized = re.sub(r'[^\w\-\.]', '_', name).strip('_')
+    sanitized = _UNSAFE_FILENAME_CHARS_RE.sub('_', name).strip('_')
     # Convert to lowercase for better cross-platform compatibility
     return sanitized.lower()
 
 
+def _map_file_sort_key(path: Path) -> tuple[int, tuple[int, ...], str]:
+    """Order timestamp-named map files chronologically, then the rest alphabetically."""
+    # Try to extract timestamp from filename (format: "YYYY-MM-DD HH_MM") as comparable integers
+    if timestamp_match := _MAP_FILE_TIMESTAMP_RE.match(path.name):
+        return 0, tuple(map(int, timestamp_match.groups())), ''
+    logfire.warn('Could not parse timestamp from filename: {filename}', filename=path.name)
+    return 1, (), str(path)
+
+
 async def sort_map_files(markdown_files_list: list[Path]) -> list[Path]:
     """
     Sort map files chronologically when possible, falling back to alphabetical.
@@ -53,25 +98,333 @@ async def sort_map_files(markdown_files_list: list[Path]) -> list[Path]:
         List of Path objects sorted first by date (for timestamp-named files)
         and then alphabetically for files without valid timestamps
     """
-    # Parse dates from filenames where possible
-    parsed_files: list[tuple[datetime, Path]] = []
-    unparseable_files: list[Path] = []
+    return sorted(markdown_files_list, key=_map_file_sort_key)
+
+
+def _split_by_budget(
+    token_counts: list[int], max_tokens: int, max_group_size: int, target_tokens: float = 0
+) -> list[list[int]]:
+    """Split item indices into contiguous groups, closing a group at the budget, size cap or target boundary."""
+    groups: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    consumed_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        past_target = target_tokens > 0 and consumed_tokens > target_tokens * (len(groups) + 1)
+        if current and (current_tokens + tokens > max_tokens or len(current) == max_group_size or past_target):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+        consumed_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def partition_map_outputs(map_outputs: list[str], max_tokens: int, max_group_size: int = 0) -> list[list[str]]:
+    """
+    Split map outputs into contiguous, balanced groups that fit within a token budget.
+
+    Order is preserved so each group stays chronological. The number of groups is
+    the minimum a greedy split needs, and tokens are spread evenly across them so
+    the last group is not left nearly empty, unless balancing would need more
+    groups than the greedy split. An output larger than the budget on
+    its own forms a single-item group.
+
+    Args:
+        map_outputs: Map output contents in reduce order
+        max_tokens: Maximum estimated tokens per group
+        max_group_size: Maximum number of outputs per group, or 0 for no limit
+
+    Returns:
+        List of groups of map outputs
+    """
+    token_counts = [estimate_tokens(output) for output in map_outputs]
+    groups = _split_by_budget(token_counts, max_tokens, max_group_size)
+    if len(groups) > 1:
+        balanced_groups = _split_by_budget(token_counts, max_tokens, max_group_size, sum(token_counts) / len(groups))
+        # Balancing can cut early around uneven outputs; never trade away the greedy group count for it
+        if len(balanced_groups) <= len(groups):
+            groups = balanced_groups
+    return [[map_outputs[index] for index in group] for group in groups]
+
+
+def merge_partial_profiles(profiles: list[ProfileCompact]) -> list[str]:
+    """
+    Merge intermediate profiles that share a canonical name and render them as Markdown.
+
+    Args:
+        profiles: Intermediate profiles produced by partial reduces
+
+    Returns:
+        One Markdown block per distinct person, suitable as input to the next reduce
+    """
+    by_name: dict[str, list[ProfileCompact]] = {}
+    for profile in profiles:
+        by_name.setdefault(sanitize_filename(profile.canonical_name), []).append(profile)
+
+    blocks: list[str] = []
+    for group in by_name.values():
+        aliases = dict.fromkeys(name for p in group for name in (p.canonical_name, *p.aliases))
+        topics = dict.fromkeys(topic for p in group for topic in p.topics)
+        decisions = dict.fromkeys(decision for p in group for decision in p.decisions)
+        notes = '\n\n'.join(p.markdown for p in group)
+        decision_lines = ''.join(f'    * {decision}\n' for decision in decisions) or '    * None Identified\n'
+        blocks.append(
+            f'## Intermediate Profile: {group[0].canonical_name}\n\n'
+            f'* **Aliases:** {", ".join(aliases)}\n'
+            f'* **Topics:** {", ".join(topics) or "N/A"}\n'
+            f'* **Decisions:**\n{decision_lines}\n'
+            f'{notes}'
+        )
+    return blocks
+
+
+def _name_key(name: str) -> str:
+    """Normalize a name to its accent-folded, lowercased, sorted word tokens."""
+    folded = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(sorted(_NAME_TOKEN_RE.findall(folded)))
+
+
+def build_alias_hints(map_outputs: list[str]) -> dict[str, list[str]]:
+    """
+    Group person headings whose names differ only in order, case, accents or punctuation.
+
+    Matching is deliberately conservative so the hints can be trusted: "Doe, Jane",
+    "jane doe" and "Jané Doe" are grouped, but "Jane" and "Jane Doe" are left to the
+    reduce model.
+
+    Args:
+        map_outputs: Map output or intermediate profile blocks
+
+    Returns:
+        Mapping of the most frequent variation of each name to its other variations,
+        for names seen with more than one variation
+    """
+    variations: dict[str, Counter[str]] = {}
+    for output in map_outputs:
+        for name in _PERSON_HEADING_RE.findall(output):
+            if key := _name_key(name):
+                variations.setdefault(key, Counter())[name] += 1
+
+    hints: dict[str, list[str]] = {}
+    for counts in variations.values():
+        if len(counts) > 1:
+            name, *others = sorted(counts, key=lambda variation: (-counts[variation], variation))
+            hints[name] = others
+    return hints
+
+
+async def _run_cached_reduce[OutputT](
+    agent: Agent[None, list[OutputT]],
+    model_name: str,
+    output_adapter: TypeAdapter[list[OutputT]],
+    system_prompt: str,
+    map_outputs: list[str],
+) -> list[OutputT]:
+    """
+    Run a reduce agent over map outputs, reusing a cached response when available.
+
+    The cache key is built from the map outputs in sorted order, so a different
+    ordering of the same map outputs still hits the cache. A cached response that
+    no longer validates is evicted and treated as a miss.
+
+    Args:
+        agent: The reduce agent to run
+        model_name: The agent's model name, included in the cache key
+        output_adapter: Adapter used to store and restore the agent's output
+        system_prompt: The agent's instructions, included in the cache key
+        map_outputs: The map output contents to reduce
+
+    Returns:
+        The list of profiles produced by the agent
+    """
+    prompt_cache = get_prompt_cache()
+    cache_key = prompt_cache_key(model_name, system_prompt, REDUCE_USER_MESSAGE_TEMPLATE, *sorted(map_outputs))
+    cached = await trio.to_thread.run_sync(prompt_cache.get, cache_key) if prompt_cache is not None else None
+    if prompt_cache is not None and cached is not None:
+        try:
+            profiles = output_adapter.validate_json(cached)
+            logfire.info('Reduce cache hit: {cache_key}', cache_key=cache_key)
+            return profiles
+        except ValidationError as e:
+            # A response stored under an older output schema is a miss; drop it so the fresh one replaces it
+            logfire.warn(
+                'Discarding invalid cached reduce response {cache_key}: {error}', cache_key=cache_key, error=str(e)
+            )
+            await trio.to_thread.run_sync(prompt_cache.delete, cache_key)
+
+    user_prompt = render_reduce_user_message('\n\n'.join(map_outputs), build_alias_hints(map_outputs))
+    profiles = await run_agent_with_retries(agent, user_prompt, system_prompt)
+    if prompt_cache is not None:
+        await trio.to_thread.run_sync(prompt_cache.set, cache_key, output_adapter.dump_json(profiles).decode('utf-8'))
+    return profiles
+
+
+def apply_profile_review(drafts: list[Profile], review: ProfileReview) -> list[Profile]:
+    """
+    Combine draft profiles with the reduce model's review of them.
+
+    Drafts named in `review.accepted_names` are kept unless a revised profile for the
+    same person supersedes them; drafts the review does not mention are dropped.
+
+    Args:
+        drafts: Profiles produced by the draft model
+        review: The reduce model's verdict on the drafts
+
+    Returns:
+        The accepted drafts followed by the revised profiles
+    """
+    accepted = {sanitize_filename(name) for name in review.accepted_names}
+    revised = {sanitize_filename(profile.metadata.name) for profile in review.revised_profiles}
+    kept = [
+        draft
+        for draft in drafts
+        if (name := sanitize_filename(draft.metadata.name)) in accepted and name not in revised
+    ]
+    return kept + review.revised_profiles
+
+
+async def _verify_draft_profiles(drafts: list[Profile], map_outputs: list[str]) -> list[Profile]:
+    """
+    Have the reduce model review draft profiles against the map outputs they came from.
+
+    A cached review that no longer validates is evicted and treated as a miss.
+
+    Args:
+        drafts: Profiles produced by the draft model
+        map_outputs: The map output contents the drafts were produced from
 
-    for path in markdown_files_list:
+    Returns:
+        The verified list of profiles
+    """
+    draft_json = _PROFILE_LIST_ADAPTER.dump_json(drafts).decode('utf-8')
+    prompt_cache = get_prompt_cache()
+    cache_key = prompt_cache_key(
+        get_settings().reduce_phase.llm_model, VERIFY_REDUCE_SYSTEM_PROMPT, draft_json, *sorted(map_outputs)
+    )
+    cached = await trio.to_thread.run_sync(prompt_cache.get, cache_key) if prompt_cache is not None else None
+    review: ProfileReview | None = None
+    if prompt_cache is not None and cached is not None:
         try:
-            # Try to extract timestamp from filename (format: "YYYY-MM-DD HH_MM")
-            dt = datetime.strptime(path.name[:16], '%Y-%m-%d %H_%M')
-            parsed_files.append((dt, path))
-        except ValueError:
-            logfire.warn(f'Could not parse timestamp from filename: {path.name}')
-            unparseable_files.append(path)
+            review = ProfileReview.model_validate_json(cached)
+            logfire.info('Verify reduce cache hit: {cache_key}', cache_key=cache_key)
+        except ValidationError as e:
+            logfire.warn(
+                'Discarding invalid cached verify response {cache_key}: {error}', cache_key=cache_key, error=str(e)
+            )
+            await trio.to_thread.run_sync(prompt_cache.delete, cache_key)
 
-    # Sort chronological files by date, then combine with alphabetically sorted unparseable files
-    sorted_parsed = sorted(parsed_files, key=lambda x: x[0])  # Sort by datetime
-    sorted_unparseable = sorted(unparseable_files)
+    if review is None:
+        user_prompt = render_verify_reduce_user_message(
+            draft_json, '\n\n'.join(map_outputs), build_alias_hints(map_outputs)
+        )
+        review = await run_agent_with_retries(get_verify_reduce_agent(), user_prompt, VERIFY_REDUCE_SYSTEM_PROMPT)
+        if prompt_cache is not None:
+            await trio.to_thread.run_sync(prompt_cache.set, cache_key, review.model_dump_json())
 
-    # Return files in order: chronological first, then alphabetical
-    return [path for _, path in sorted_parsed] + sorted_unparseable
+    logfire.info(
+        'Verified {drafts_count} draft profiles: {accepted_count} accepted, {revised_count} revised',
+        drafts_count=len(drafts),
+        accepted_count=len(review.accepted_names),
+        revised_count=len(review.revised_profiles),
+    )
+    return apply_profile_review(drafts, review)
+
+
+async def _run_final_reduce(map_outputs: list[str]) -> list[Profile]:
+    """
+    Run the final reduce, drafting with `reduce_phase.draft_llm_model` first when it is set.
+
+    Args:
+        map_outputs: The map output contents to reduce
+
+    Returns:
+        The final list of profiles
+    """
+    reduce_phase = get_settings().reduce_phase
+    if reduce_phase.draft_llm_model is None:
+        return await _run_cached_reduce(
+            get_reduce_agent(), reduce_phase.llm_model, _PROFILE_LIST_ADAPTER, REDUCE_SYSTEM_PROMPT, map_outputs
+        )
+
+    drafts = await _run_cached_reduce(
+        get_draft_reduce_agent(), reduce_phase.draft_llm_model, _PROFILE_LIST_ADAPTER, REDUCE_SYSTEM_PROMPT, map_outputs
+    )
+    return await _verify_draft_profiles(drafts, map_outputs)
+
+
+async def reduce_map_outputs(map_outputs: list[str]) -> list[Profile]:
+    """
+    Reduce map outputs to final profiles, splitting the work when it is too large.
+
+    Map outputs that fit within `reduce_phase.max_payload_tokens` (and, when set,
+    `reduce_phase.max_fanout` blocks) are reduced in a single call. Larger inputs
+    are split into contiguous groups that are reduced concurrently into
+    intermediate profiles. Each group's profiles, merged by name, become one block
+    of the next level, so every level shrinks the block count by the fanout and
+    the levels repeat until a single call suffices.
+
+    Args:
+        map_outputs: Non-empty map output contents in chronological order
+
+    Returns:
+        The final list of profiles
+    """
+    settings = get_settings()
+    max_tokens = settings.reduce_phase.max_payload_tokens
+    max_fanout = settings.reduce_phase.max_fanout
+    blocks = map_outputs
+    total_tokens = sum(estimate_tokens(block) for block in blocks)
+    level = 0
+
+    while True:
+        groups = partition_map_outputs(blocks, max_tokens, max_fanout)
+        # Reduce in one call once everything fits, or when grouping can no longer combine anything
+        if len(groups) == 1 or len(groups) == len(blocks):
+            if len(groups) > 1:
+                logfire.warn(
+                    'Reduce payload of ~{tokens} tokens exceeds the {max_tokens} token budget',
+                    tokens=total_tokens,
+                    max_tokens=max_tokens,
+                )
+            return await _run_final_reduce(blocks)
+
+        level += 1
+        logfire.info(
+            'Reduce level {level}: {groups_count} partial reduces over {blocks_count} blocks',
+            level=level,
+            groups_count=len(groups),
+            blocks_count=len(blocks),
+        )
+        partials: list[list[ProfileCompact]] = [[] for _ in groups]
+        limiter = trio.CapacityLimiter(settings.processing.concurrency)
+
+        async def reduce_group(index: int, group: list[str]) -> None:
+            async with limiter:
+                partials[index] = await _run_cached_reduce(
+                    get_partial_reduce_agent(),
+                    settings.reduce_phase.llm_model,
+                    _COMPACT_PROFILE_LIST_ADAPTER,
+                    PARTIAL_REDUCE_SYSTEM_PROMPT,
+                    group,
+                )
+
+        async with trio.open_nursery() as nursery:
+            for index, group in enumerate(groups):
+                nursery.start_soon(reduce_group, index, group)
+
+        # One block per group rather than per person, so a fanout cap below the number of people still converges
+        blocks = [block for partial in partials if (block := '\n\n'.join(merge_partial_profiles(partial)))]
+        if not blocks:
+            return []
+
+        # Stop splitting if a level failed to shrink the payload
+        previous_tokens, total_tokens = total_tokens, sum(estimate_tokens(block) for block in blocks)
+        if total_tokens >= previous_tokens:
+            logfire.warn('Partial reduces did not shrink the payload; running the final reduce directly')
+            return await _run_final_reduce(blocks)
 
 
 async def run_reduce_phase() -> tuple[bool, int]:
@@ -79,89 +432,111 @@ async def run_reduce_phase() -> tuple[bool, int]:
     Reads map phase outputs, concatenates them, runs them through a reduce agent,
     and saves individual profile files with YAML frontmatter for each person.
 
-    Uses configuration from module-level settings.
+    Uses configuration from get_settings().
 
     Returns:
         A tuple containing (success: bool, processed_files_count: int)
     """
-    # Use module-level settings
+    settings = get_settings()
     map_output_dir = Path(settings.map_phase.output_map_dir)
     output_profiles_dir = Path(settings.reduce_phase.output_profiles_dir)
 
     logfire.info('--- Starting Reduce Phase ---')
-    logfire.info(f'Reading map outputs from: {map_output_dir}')
-    logfire.info(f'Target directory for profile outputs: {output_profiles_dir}')
+    logfire.info('Reading map outputs from: {map_output_dir}', map_output_dir=str(map_output_dir))
+    logfire.info(
+        'Target directory for profile outputs: {output_profiles_dir}', output_profiles_dir=str(output_profiles_dir)
+    )
 
     # Find and sort all map output files
-    markdown_files: list[Path] = [path for path in await map_output_dir.glob('*.map.md')]
+    markdown_files: list[Path] = await scan_files(map_output_dir, '.map.md')
     
     if not markdown_files:
-        logfire.warn(f'No .map.md files found in {map_output_dir}. Skipping reduce agent processing.')
+        logfire.warn(
+            'No .map.md files found in {map_output_dir}. Skipping reduce agent processing.',
+            map_output_dir=str(map_output_dir),
+        )
         logfire.info('--- Reduce Phase Complete (Skipped due to no input map files) ---')
         return False, 0
 
     # Sort files chronologically when possible
     sorted_files: list[Path] = await sort_map_files(markdown_files)
     
-    # Read and concatenate non-empty file contents
-    raw_map_outputs: list[str] = []
-    for file_path in sorted_files:
-        content = await file_path.read_text(encoding='utf-8')
-        if content.strip():  # Skip empty content
-            raw_map_outputs.append(content)
+    # Read all files concurrently, keeping the chronological order and skipping empty content
+    contents: list[str] = [''] * len(sorted_files)
+    read_limiter = trio.CapacityLimiter(FILE_IO_CONCURRENCY)
+
+    async def read_map_output(index: int, file_path: Path) -> None:
+        async with read_limiter:
+            contents[index] = (await file_path.read_bytes()).decode('utf-8')
+
+    async with trio.open_nursery() as nursery:
+        for index, file_path in enumerate(sorted_files):
+            nursery.start_soon(read_map_output, index, file_path)
+    raw_map_outputs: list[str] = [content for content in contents if content.strip()]
     
     if not raw_map_outputs:
-        logfire.warn(f'No non-empty content read from .map.md files in {map_output_dir}. Skipping reduce agent.')
+        logfire.warn(
+            'No non-empty content read from .map.md files in {map_output_dir}. Skipping reduce agent.',
+            map_output_dir=str(map_output_dir),
+        )
         logfire.info('--- Reduce Phase Complete (Skipped due to no map content) ---')
         return False, 0
 
     # Process content with the reduce agent
     with logfire.span('reduce_agent_processing', files_count=len(raw_map_outputs)):
-        # Concatenate content with double newlines between file contents for separation
-        concatenated_map_data = '\n\n'.join(raw_map_outputs)
-        logfire.info(f'Processing {len(raw_map_outputs)} map outputs. Total size: {len(concatenated_map_data)} chars.')
-
-        # Format and run the prompt
-        reduce_user_prompt = REDUCE_USER_MESSAGE_TEMPLATE.replace(
-            '{{CONCATENATED_MARKDOWN_BLOCKS_HERE}}',
-            concatenated_map_data
+        total_chars = sum(len(output) for output in raw_map_outputs)
+        logfire.info(
+            'Processing {files_count} map outputs. Total size: {total_chars} chars.',
+            files_count=len(raw_map_outputs),
+            total_chars=total_chars,
         )
 
         try:
-            # Use structured output with List[Profile] type from the agent definition
-            result = await reduce_agent.run(reduce_user_prompt)
+            # Use structured output with List[Profile] type from the agent definitions
+            profiles = await reduce_map_outputs(raw_map_outputs)
             
-            if not result or not result.output or len(result.output) == 0:
+            if not profiles:
                 logfire.info('Reduce agent returned empty output or no profiles.')
                 return False, len(raw_map_outputs)
             
             # Ensure output directory exists
             await output_profiles_dir.mkdir(exist_ok=True, parents=True)
-            logfire.info(f'Ensured output directory exists: {output_profiles_dir}')
+            logfire.info('Ensured output directory exists: {dir_path}', dir_path=str(output_profiles_dir))
             
-            # Process each profile and write to individual files
-            profiles_written = 0
-            for profile in result.output:
+            # Render each profile's file; a later profile with the same filename replaces an earlier one
+            profile_files: dict[Path, str] = {}
+            for profile in profiles:
                 # Generate filename based on sanitized person name
                 filename = f'{sanitize_filename(profile.metadata.name)}.md'
                 profile_path = output_profiles_dir / filename
                 
                 # Create YAML frontmatter from metadata
-                frontmatter = yaml.dump(profile.metadata.model_dump(), sort_keys=False)
+                frontmatter = yaml.dump(profile.metadata.model_dump(), Dumper=_YAML_DUMPER, sort_keys=False)
                 
                 # Combine frontmatter with content
-                file_content = f'---\n{frontmatter}---\n\n{profile.content}'
-                
-                # Write the file
-                await profile_path.write_text(file_content, encoding='utf-8')
-                logfire.info(f'Wrote profile for {profile.metadata.name} to {profile_path}')
-                profiles_written += 1
+                profile_files[profile_path] = f'---\n{frontmatter}---\n\n{profile.content}'
+            
+            # Write the files concurrently
+            write_limiter = trio.CapacityLimiter(FILE_IO_CONCURRENCY)
+
+            async def write_profile(profile_path: Path, file_content: str) -> None:
+                async with write_limiter:
+                    await profile_path.write_text(file_content, encoding='utf-8')
+
+            async with trio.open_nursery() as nursery:
+                for profile_path, file_content in profile_files.items():
+                    nursery.start_soon(write_profile, profile_path, file_content)
+            profiles_written = len(profile_files)
             
-            logfire.info(f'Reduce phase processed. Wrote {profiles_written} profile files to {output_profiles_dir}')
+            logfire.info(
+                'Reduce phase processed. Wrote {profiles_written} profile files to {output_profiles_dir}',
+                profiles_written=profiles_written,
+                output_profiles_dir=str(output_profiles_dir),
+            )
             logfire.info('--- Reduce Phase Complete ---')
             
             return True, len(sorted_files)
         except Exception as e:
-            logfire.error(f'Error during Reduce Agent processing: {e}', exc_info=True)
+            logfire.error('Error during Reduce Agent processing: {error}', error=str(e), exc_info=True)
             logfire.info('--- Reduce Phase Failed ---')
             return False, len(raw_map_outputs)
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Client-side token rate limiting for LLM requests.
+
+Providers enforce tokens-per-minute quotas. Retrying after a 429 works, but at
+high concurrency most requests end up waiting on backoff. When a quota is
+configured, requests instead wait on a shared token bucket so the pipeline
+stays just under the limit.
+"""
+
+from functools import cache
+
+import trio
+
+from synapse.config import get_settings
+
+
+class TokenBucket:
+    """Token bucket that refills continuously up to one minute's worth of tokens."""
+
+    def __init__(self, tokens_per_minute: int):
+        self._capacity = float(tokens_per_minute)
+        self._refill_per_second = tokens_per_minute / 60
+        self._tokens = self._capacity
+        self._updated_at: float | None = None
+        self._lock = trio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until `tokens` are available and take them from the bucket.
+
+        Requests larger than the bucket only wait for a full bucket, so an
+        oversized prompt is throttled rather than blocked forever.
+
+        Args:
+            tokens: Estimated number of tokens the request will consume
+        """
+        needed = min(float(tokens), self._capacity)
+        # Waiters are served in arrival order: the lock is held while sleeping for a refill
+        async with self._lock:
+            while True:
+                now = trio.current_time()
+                if self._updated_at is not None:
+                    elapsed = now - self._updated_at
+                    self._tokens = min(self._capacity, self._tokens + elapsed * self._refill_per_second)
+                self._updated_at = now
+                if self._tokens >= needed:
+                    self._tokens -= needed
+                    return
+                await trio.sleep((needed - self._tokens) / self._refill_per_second)
+
+
+@cache
+def get_token_bucket() -> TokenBucket | None:
+    """Return the shared token bucket, or None when no token quota is configured."""
+    tokens_per_minute = get_settings().processing.tokens_per_minute
+    if not tokens_per_minute:
+        return None
+    return TokenBucket(tokens_per_minute)
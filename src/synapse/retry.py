@@ -0,0 +1,88 @@
+"""
+Retry helpers for LLM requests.
+
+Long map and reduce batches regularly hit rate limits and transient provider
+errors. Retrying the failed request with jittered exponential backoff keeps the
+rest of the worker pool running instead of failing the transcript outright.
+"""
+
+import random
+
+import httpx
+import logfire
+import trio
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+
+from synapse.config import get_settings
+from synapse.rate_limit import get_token_bucket
+from synapse.tokens import estimate_tokens
+
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Return True if `error` is a rate limit, transient server error or transport failure."""
+    if isinstance(error, ModelHTTPError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def backoff_delay(attempt: int, max_wait: float) -> float:
+    """
+    Compute a full-jitter exponential backoff delay.
+
+    Args:
+        attempt: The zero-based number of the retry about to be made
+        max_wait: Upper bound on the delay in seconds
+
+    Returns:
+        The number of seconds to wait before retrying
+    """
+    return random.uniform(0, min(max_wait, 2.0**attempt))
+
+
+async def run_agent_with_retries[OutputT](
+    agent: Agent[None, OutputT], user_prompt: str, instructions: str = ''
+) -> OutputT:
+    """
+    Run an agent, retrying rate-limited and transient failures with backoff.
+
+    When a token quota is configured, each attempt first waits on the shared token bucket
+    for the estimated size of the system prompt and user message together.
+
+    Args:
+        agent: The agent to run
+        user_prompt: The rendered user message
+        instructions: The agent's system prompt, sent with every request
+
+    Returns:
+        The agent's output
+
+    Raises:
+        Exception: The last error once retries are exhausted, or any non-retryable error
+    """
+    settings = get_settings()
+    max_retries = settings.processing.max_retries
+    token_bucket = get_token_bucket()
+    request_tokens = estimate_tokens(instructions) + estimate_tokens(user_prompt)
+    attempt = 0
+    while True:
+        if token_bucket is not None:
+            await token_bucket.acquire(request_tokens)
+        try:
+            result = await agent.run(user_prompt)
+            return result.output
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = backoff_delay(attempt, settings.processing.retry_max_wait)
+            attempt += 1
+            logfire.warn(
+                'Retrying LLM request ({attempt}/{max_retries}) in {delay:.1f}s after error: {error}',
+                attempt=attempt,
+                max_retries=max_retries,
+                delay=delay,
+                error=str(e),
+            )
+            await trio.sleep(delay)
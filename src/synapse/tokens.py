@@ -0,0 +1,23 @@
+"""
+Token estimation helpers.
+
+Budget decisions (reduce partitioning, map batching) need token counts for
+prompts sent to the configured Gemini models. There is no local tokenizer for
+those models (tiktoken only ships OpenAI encodings), so sizes are estimated
+from character counts.
+"""
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        An approximate token count
+    """
+    return len(text) // CHARS_PER_TOKEN
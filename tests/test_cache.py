@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from synapse.cache import PromptCache, prompt_cache_key
+
+
+def test_prompt_cache_key_ignores_whitespace_changes():
+    assert prompt_cache_key('model', 'system', 'Alice:  hello\n\nBob: hi') == prompt_cache_key(
+        'model', 'system', 'Alice: hello Bob: hi '
+    )
+
+
+def test_prompt_cache_key_depends_on_model_and_parts():
+    key = prompt_cache_key('model-a', 'system', 'user')
+    assert key != prompt_cache_key('model-b', 'system', 'user')
+    assert key != prompt_cache_key('model-a', 'other system', 'user')
+    assert key != prompt_cache_key('model-a', 'systemuser')
+
+
+def test_prompt_cache_roundtrip(tmp_path: Path):
+    cache = PromptCache(tmp_path / 'cache' / 'responses.sqlite3')
+    assert cache.get('key') is None
+
+    cache.set('key', 'value')
+    cache.set('key', 'updated')
+    assert cache.get('key') == 'updated'
+    cache.close()
+
+    reopened = PromptCache(tmp_path / 'cache' / 'responses.sqlite3')
+    assert reopened.get('key') == 'updated'
+    reopened.close()
+
+
+def test_prompt_cache_memory_tier_evicts_least_recently_used(tmp_path: Path):
+    cache = PromptCache(tmp_path / 'responses.sqlite3', memory_maxsize=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+
+    assert list(cache._memory) == ['a', 'c']  # pyright: ignore[reportPrivateUsage]
+    assert cache.get('b') == '2'  # still served from SQLite
+    cache.close()
+
+
+def test_prompt_cache_delete(tmp_path: Path):
+    cache = PromptCache(tmp_path / 'responses.sqlite3')
+    cache.set('key', 'value')
+    cache.delete('key')
+    assert cache.get('key') is None
+    cache.close()
+
+    reopened = PromptCache(tmp_path / 'responses.sqlite3')
+    assert reopened.get('key') is None
+    reopened.close()
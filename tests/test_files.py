@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+import trio
+
+from synapse.files import (
+    file_sizes,
+    has_file_with_suffix,
+    is_up_to_date,
+    list_files_with_suffix,
+    read_text_files,
+    scan_files,
+)
+
+
+def test_list_files_with_suffix_matches_regular_files_only(tmp_path: Path):
+    (tmp_path / 'a.txt').write_text('a')
+    (tmp_path / 'b.map.md').write_text('b')
+    (tmp_path / 'notes.txt.bak').write_text('c')
+    (tmp_path / 'dir.txt').mkdir()
+
+    assert list_files_with_suffix(str(tmp_path), '.txt') == [str(tmp_path / 'a.txt')]
+    assert list_files_with_suffix(str(tmp_path), '.map.md') == [str(tmp_path / 'b.map.md')]
+
+
+def test_scan_files_returns_trio_paths(tmp_path: Path):
+    (tmp_path / 'a.txt').write_text('a')
+
+    files = trio.run(scan_files, trio.Path(tmp_path), '.txt')
+
+    assert files == [trio.Path(tmp_path / 'a.txt')]
+
+
+def test_has_file_with_suffix(tmp_path: Path):
+    assert not has_file_with_suffix(str(tmp_path), '.txt')
+    (tmp_path / 'dir.txt').mkdir()
+    assert not has_file_with_suffix(str(tmp_path), '.txt')
+    (tmp_path / 'a.txt').write_text('a')
+    assert has_file_with_suffix(str(tmp_path), '.txt')
+
+
+def test_file_sizes_preserves_order(tmp_path: Path):
+    (tmp_path / 'a.txt').write_text('aaa')
+    (tmp_path / 'b.txt').write_text('b')
+
+    sizes = trio.run(file_sizes, [trio.Path(tmp_path / 'a.txt'), trio.Path(tmp_path / 'b.txt')])
+
+    assert sizes == [3, 1]
+
+
+def test_is_up_to_date_compares_modification_times(tmp_path: Path):
+    source = tmp_path / 'a.txt'
+    target = tmp_path / 'a.map.md'
+    source.write_text('a')
+    assert not is_up_to_date(str(source), str(target))
+
+    target.write_text('b')
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(target, ns=(2_000_000_000, 2_000_000_000))
+    assert is_up_to_date(str(source), str(target))
+
+    os.utime(source, ns=(3_000_000_000, 3_000_000_000))
+    assert not is_up_to_date(str(source), str(target))
+
+
+def test_read_text_files_captures_errors(tmp_path: Path):
+    (tmp_path / 'a.txt').write_text('hello', encoding='utf-8')
+
+    contents = read_text_files([str(tmp_path / 'a.txt'), str(tmp_path / 'missing.txt')])
+
+    assert contents[0] == 'hello'
+    assert isinstance(contents[1], FileNotFoundError)
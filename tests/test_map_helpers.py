@@ -0,0 +1,90 @@
+from synapse.agents import render_map_packed_user_message
+from synapse.processors.map import (
+    apply_glossary,
+    build_glossary,
+    is_no_key_persons_output,
+    pack_transcripts,
+    split_packed_map_output,
+    split_transcript,
+)
+
+
+def test_pack_transcripts_first_fit_decreasing_and_oversized_alone():
+    transcripts = [('a', 40), ('b', 50), ('c', 200), ('d', 10), ('e', 20)]
+    assert pack_transcripts(transcripts, max_tokens=100) == [['c'], ['b', 'a', 'd'], ['e']]
+
+
+def test_pack_transcripts_fills_gaps_beside_large_transcripts():
+    transcripts = [('a', 60), ('b', 50), ('c', 40), ('d', 50)]
+    assert pack_transcripts(transcripts, max_tokens=100) == [['a', 'c'], ['b', 'd']]
+
+
+def test_pack_transcripts_respects_transcript_cap():
+    transcripts = [('a', 1), ('b', 1), ('c', 1)]
+    assert pack_transcripts(transcripts, max_tokens=100, max_transcripts=2) == [['a', 'b'], ['c']]
+
+
+def test_pack_transcripts_keeps_split_transcripts_out_of_packs():
+    transcripts = [('a', 60), ('b', 30), ('c', 20)]
+    assert pack_transcripts(transcripts, max_tokens=100, split_tokens=50) == [['a'], ['b', 'c']]
+
+
+def test_pack_transcripts_disabled():
+    assert pack_transcripts([('a', 1), ('b', 1)], max_tokens=0) == [['a'], ['b']]
+
+
+def test_split_transcript_on_line_boundaries():
+    transcript = 'Alice: ' + 'a' * 30 + '\nBob: ' + 'b' * 30 + '\nCarol: ' + 'c' * 30
+    # 10 tokens is ~40 chars, so each speaker line becomes its own part
+    assert split_transcript(transcript, 10) == transcript.split('\n')
+    assert split_transcript(transcript, 1000) == [transcript]
+    assert split_transcript(transcript, 0) == [transcript]
+
+
+def test_split_transcript_cuts_overlong_lines():
+    assert split_transcript('x' * 100, 10) == ['x' * 40, 'x' * 40, 'x' * 20]
+
+
+def test_split_packed_map_output_routes_sections():
+    map_output = (
+        '## Person Identified: Alice\n\n* **Transcript Source:** `one.txt`\n* **Date Hint:** `N/A`\n\n'
+        '## Person Identified: Bob\n\n* **Transcript Source:** `two.txt`\n\n'
+        '## Person Identified: Carol\n\n* **Transcript Source:** `one.txt`\n\n'
+        '## Person Identified: Mallory\n\n* **Transcript Source:** `unknown.txt`\n'
+    )
+    routed = split_packed_map_output(map_output, ['one.txt', 'two.txt', 'three.txt'])
+
+    assert set(routed) == {'one.txt', 'two.txt'}
+    assert routed['one.txt'].startswith('## Person Identified: Alice')
+    assert '## Person Identified: Carol' in routed['one.txt']
+    assert 'Bob' not in routed['one.txt']
+
+
+def test_render_map_packed_user_message_tags_each_transcript():
+    message = render_map_packed_user_message([('one.txt', 'hello'), ('two.txt', 'world')])
+    assert message.endswith(
+        '<transcript filename="one.txt">\nhello\n</transcript>\n\n<transcript filename="two.txt">\nworld\n</transcript>'
+    )
+
+
+def test_build_glossary_picks_repeated_long_lines():
+    footer = 'This meeting was recorded for internal use by Acme Corp only.'
+    texts = [f'Alice: hi\n{footer}', f'Bob: hello\n{footer}', f'{footer}\nCarol: short line']
+    glossary = build_glossary(texts)
+
+    assert glossary == {'$TMPL1$': footer}
+    assert apply_glossary(texts[0], glossary) == 'Alice: hi\n$TMPL1$'
+    assert build_glossary(['Alice: hi', 'Bob: hello']) == {}
+
+
+def test_render_map_packed_user_message_includes_glossary():
+    message = render_map_packed_user_message([('one.txt', '$TMPL1$')], {'$TMPL1$': 'Standing agenda line'})
+    assert '<glossary>' in message
+    assert '$TMPL1$ = Standing agenda line\n</glossary>\n\n<transcript filename="one.txt">' in message
+
+
+def test_is_no_key_persons_output():
+    assert is_no_key_persons_output('No key persons identified in this transcript.')
+    assert is_no_key_persons_output('\n  No key persons identified in this transcript.\n')
+    assert not is_no_key_persons_output('## Person Identified: Alice\n' * 10)
+    assert not is_no_key_persons_output('')
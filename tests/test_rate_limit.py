@@ -0,0 +1,34 @@
+import trio
+import trio.testing
+
+from synapse.rate_limit import TokenBucket
+
+
+def test_token_bucket_waits_for_refill():
+    async def scenario() -> list[float]:
+        bucket = TokenBucket(tokens_per_minute=600)
+        started = trio.current_time()
+        finished_at = []
+        for _ in range(3):
+            await bucket.acquire(300)
+            finished_at.append(trio.current_time() - started)
+        return finished_at
+
+    finished_at = trio.run(scenario, clock=trio.testing.MockClock(autojump_threshold=0))
+
+    # The first two requests fit in the initial bucket; the third waits 30s for 300 tokens at 10 tokens/s
+    assert finished_at[:2] == [0, 0]
+    assert abs(finished_at[2] - 30) < 1e-6
+
+
+def test_token_bucket_caps_oversized_requests():
+    async def scenario() -> float:
+        bucket = TokenBucket(tokens_per_minute=60)
+        started = trio.current_time()
+        await bucket.acquire(1_000)
+        await bucket.acquire(1_000)
+        return trio.current_time() - started
+
+    elapsed = trio.run(scenario, clock=trio.testing.MockClock(autojump_threshold=0))
+
+    assert abs(elapsed - 60) < 1e-6
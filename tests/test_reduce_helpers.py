@@ -1,7 +1,28 @@
+import pathlib
+import re
+
 import pytest
+from pydantic import TypeAdapter
 from trio import Path
 
-from synapse.processors.reduce import sanitize_filename, sort_map_files
+from synapse.agents import (
+    REDUCE_USER_MESSAGE_TEMPLATE,
+    VERIFY_REDUCE_SYSTEM_PROMPT,
+    render_verify_reduce_user_message,
+)
+from synapse.cache import PromptCache, prompt_cache_key
+from synapse.config import get_settings
+from synapse.models import Profile, ProfileCompact, ProfileMetadata, ProfileReview
+from synapse.processors import reduce
+from synapse.processors.reduce import (
+    apply_profile_review,
+    build_alias_hints,
+    merge_partial_profiles,
+    partition_map_outputs,
+    reduce_map_outputs,
+    sanitize_filename,
+    sort_map_files,
+)
 
 
 def test_sanitize_filename_basic():
@@ -38,3 +59,180 @@ async def test_sort_map_files_chronological_and_alphabetical():
 
     assert sorted_paths == expected_order
 
+
+def test_partition_map_outputs_respects_budget_and_order():
+    outputs = ['a' * 40, 'b' * 40, 'c' * 40, 'd' * 400]
+    # 40 chars is ~10 tokens; a budget of 25 fits two per group, the oversize output stands alone
+    assert partition_map_outputs(outputs, 25) == [['a' * 40, 'b' * 40], ['c' * 40], ['d' * 400]]
+
+
+def test_partition_map_outputs_single_group_when_within_budget():
+    outputs = ['first', 'second']
+    assert partition_map_outputs(outputs, 1000) == [outputs]
+
+
+def test_partition_map_outputs_balances_groups():
+    outputs = ['a' * 40, 'b' * 40, 'c' * 40, 'd' * 40, 'e' * 40]
+    # A greedy split at 40 tokens would leave [a, b, c, d] and [e]
+    assert partition_map_outputs(outputs, 40) == [['a' * 40, 'b' * 40, 'c' * 40], ['d' * 40, 'e' * 40]]
+
+
+def test_partition_map_outputs_never_exceeds_greedy_group_count():
+    outputs = ['x' * 32, 'y' * 4, 'z' * 8, 'w' * 8]
+    # Balancing around the oversized first output would split every block apart
+    assert partition_map_outputs(outputs, 3) == [['x' * 32], ['y' * 4, 'z' * 8], ['w' * 8]]
+
+
+def test_partition_map_outputs_caps_group_size():
+    outputs = ['a', 'b', 'c', 'd', 'e']
+    assert partition_map_outputs(outputs, 1000, max_group_size=2) == [['a', 'b'], ['c', 'd'], ['e']]
+
+
+def test_merge_partial_profiles_groups_by_canonical_name():
+    blocks = merge_partial_profiles(
+        [
+            ProfileCompact(canonical_name='Jane Doe', aliases=['Jane'], topics=['Budget'], markdown='first part'),
+            ProfileCompact(canonical_name='Bob Smith', markdown='bob part'),
+            ProfileCompact(
+                canonical_name='jane doe', aliases=['J. Doe'], decisions=['Approved Q3 budget'], markdown='second part'
+            ),
+        ]
+    )
+
+    assert len(blocks) == 2
+    jane = blocks[0]
+    assert jane.startswith('## Intermediate Profile: Jane Doe')
+    assert '* **Aliases:** Jane Doe, Jane, jane doe, J. Doe' in jane
+    assert '* **Topics:** Budget' in jane
+    assert '    * Approved Q3 budget' in jane
+    assert 'first part\n\nsecond part' in jane
+    assert '    * None Identified' in blocks[1]
+
+
+def _profile(name: str, content: str = '') -> Profile:
+    return Profile(metadata=ProfileMetadata(name=name, role='Engineer'), content=content)
+
+
+def test_apply_profile_review_keeps_accepted_and_replaces_revised():
+    drafts = [_profile('Jane Doe', 'draft'), _profile('Bob Smith', 'draft'), _profile('Minor Person')]
+    review = ProfileReview(
+        accepted_names=['jane doe', 'Bob Smith'],
+        revised_profiles=[_profile('Bob Smith', 'fixed'), _profile('Carol White', 'new')],
+    )
+
+    profiles = apply_profile_review(drafts, review)
+
+    assert [(p.metadata.name, p.content) for p in profiles] == [
+        ('Jane Doe', 'draft'),
+        ('Bob Smith', 'fixed'),
+        ('Carol White', 'new'),
+    ]
+
+
+def test_build_alias_hints_groups_only_equivalent_names():
+    outputs = [
+        '## Person Identified: Jane Doe\n\n* **Transcript Source:** `a.txt`',
+        '## Person Identified: Doe, Jane\n\n## Person Identified: Bob',
+        '## Person Identified: Jane Doe\n\n## Person Identified: Jane',
+        '## Intermediate Profile: José Núñez\n\n## Person Identified: Jose Nunez',
+    ]
+    assert build_alias_hints(outputs) == {'Jane Doe': ['Doe, Jane'], 'Jose Nunez': ['José Núñez']}
+
+
+
+def test_render_verify_reduce_user_message_includes_alias_hints():
+    message = render_verify_reduce_user_message('[]', 'payload', {'Jane Doe': ['Doe, Jane']})
+    assert message.startswith('<aliases>\nJane Doe: Doe, Jane\n</aliases>\n\n<draft>\n[]\n</draft>')
+    assert '<payload>\npayload\n</payload>' in message
+    assert render_verify_reduce_user_message('[]', 'payload').startswith('<draft>')
+
+
+@pytest.mark.trio
+async def test_run_cached_reduce_evicts_invalid_cached_response(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    prompt_cache = PromptCache(tmp_path / 'responses.sqlite3')
+    cache_key = prompt_cache_key('model', 'system', REDUCE_USER_MESSAGE_TEMPLATE, 'map output')
+    prompt_cache.set(cache_key, '[{"stale": true}]')
+
+    async def fake_run_agent_with_retries(agent: object, user_prompt: str, instructions: str = '') -> list[Profile]:
+        return [_profile('Jane Doe')]
+
+    monkeypatch.setattr(reduce, 'get_prompt_cache', lambda: prompt_cache)
+    monkeypatch.setattr(reduce, 'run_agent_with_retries', fake_run_agent_with_retries)
+    adapter = TypeAdapter(list[Profile])
+
+    profiles = await reduce._run_cached_reduce(  # pyright: ignore[reportPrivateUsage]
+        object(),  # pyright: ignore[reportArgumentType]
+        'model',
+        adapter,
+        'system',
+        ['map output'],
+    )
+
+    assert profiles == [_profile('Jane Doe')]
+    assert adapter.validate_json(prompt_cache.get(cache_key) or '') == profiles
+    prompt_cache.close()
+
+
+@pytest.mark.trio
+async def test_reduce_map_outputs_fanout_converges_in_logarithmic_levels(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv('SYNAPSE_REDUCE_PHASE__MAX_FANOUT', '8')
+    get_settings.cache_clear()
+    partial_group_sizes: list[int] = []
+
+    async def fake_partial_reduce(
+        agent: object, model_name: str, output_adapter: object, system_prompt: str, group: list[str]
+    ) -> list[ProfileCompact]:
+        text = '\n\n'.join(group)
+        partial_group_sizes.append(len(group))
+        names = dict.fromkeys(re.findall(r'^## (?:Person Identified|Intermediate Profile): (.+)$', text, re.MULTILINE))
+        # Each intermediate profile keeps 90% of its share of the input
+        chars = int(len(text) * 0.9) // len(names)
+        return [ProfileCompact(canonical_name=name, markdown='x' * chars) for name in names]
+
+    async def fake_final_reduce(map_outputs: list[str]) -> list[Profile]:
+        return [_profile(f'{len(map_outputs)} blocks')]
+
+    monkeypatch.setattr(reduce, 'get_partial_reduce_agent', lambda: None)
+    monkeypatch.setattr(reduce, '_run_cached_reduce', fake_partial_reduce)
+    monkeypatch.setattr(reduce, '_run_final_reduce', fake_final_reduce)
+    map_outputs = [f'## Person Identified: Person {index % 20}\n\n' + 'n' * 4000 for index in range(100)]
+
+    try:
+        profiles = await reduce_map_outputs(map_outputs)
+    finally:
+        get_settings.cache_clear()
+
+    # 100 blocks -> 13 partial reduces -> 2 partial reduces -> one final reduce over 2 blocks
+    assert len(partial_group_sizes) == 15
+    assert max(partial_group_sizes) <= 8
+    assert profiles == [_profile('2 blocks')]
+
+
+@pytest.mark.trio
+async def test_verify_draft_profiles_evicts_invalid_cached_review(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    drafts = [_profile('Jane Doe', 'draft')]
+    prompt_cache = PromptCache(tmp_path / 'responses.sqlite3')
+    draft_json = TypeAdapter(list[Profile]).dump_json(drafts).decode('utf-8')
+    cache_key = prompt_cache_key(
+        get_settings().reduce_phase.llm_model, VERIFY_REDUCE_SYSTEM_PROMPT, draft_json, 'map output'
+    )
+    prompt_cache.set(cache_key, '{"accepted_names": "not a list"}')
+
+    async def fake_run_agent_with_retries(agent: object, user_prompt: str, instructions: str = '') -> ProfileReview:
+        return ProfileReview(accepted_names=['Jane Doe'])
+
+    monkeypatch.setattr(reduce, 'get_prompt_cache', lambda: prompt_cache)
+    monkeypatch.setattr(reduce, 'get_verify_reduce_agent', lambda: None)
+    monkeypatch.setattr(reduce, 'run_agent_with_retries', fake_run_agent_with_retries)
+
+    profiles = await reduce._verify_draft_profiles(drafts, ['map output'])  # pyright: ignore[reportPrivateUsage]
+
+    assert profiles == drafts
+    assert ProfileReview.model_validate_json(prompt_cache.get(cache_key) or '') == ProfileReview(
+        accepted_names=['Jane Doe']
+    )
+    prompt_cache.close()
@@ -0,0 +1,75 @@
+import httpx
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+
+from synapse import retry
+from synapse.config import get_settings
+from synapse.retry import backoff_delay, is_retryable_error, run_agent_with_retries
+
+
+@pytest.fixture
+def fast_retries(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv('SYNAPSE_PROCESSING__RETRY_MAX_WAIT', '0.001')
+    monkeypatch.setenv('SYNAPSE_PROCESSING__MAX_RETRIES', '2')
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+class FlakyAgent:
+    def __init__(self, errors: list[Exception]):
+        self.errors = errors
+        self.calls = 0
+
+    async def run(self, user_prompt: str):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return type('Result', (), {'output': user_prompt.upper()})()
+
+
+def test_is_retryable_error():
+    assert is_retryable_error(ModelHTTPError(429, 'model'))
+    assert is_retryable_error(ModelHTTPError(503, 'model'))
+    assert is_retryable_error(httpx.ConnectError('boom'))
+    assert not is_retryable_error(ModelHTTPError(400, 'model'))
+    assert not is_retryable_error(ValueError('bad output'))
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(attempt, max_wait=3.0) <= 3.0 for attempt in range(10))
+
+
+@pytest.mark.trio
+@pytest.mark.usefixtures('fast_retries')
+async def test_run_agent_with_retries_recovers():
+    agent = FlakyAgent([ModelHTTPError(429, 'model'), httpx.ReadTimeout('slow')])
+
+    assert await run_agent_with_retries(agent, 'hi') == 'HI'  # type: ignore[arg-type]
+    assert agent.calls == 3
+
+
+@pytest.mark.trio
+@pytest.mark.usefixtures('fast_retries')
+async def test_run_agent_with_retries_gives_up():
+    agent = FlakyAgent([ModelHTTPError(500, 'model')] * 4)
+
+    with pytest.raises(ModelHTTPError):
+        await run_agent_with_retries(agent, 'hi')  # type: ignore[arg-type]
+    assert agent.calls == 3
+
+
+@pytest.mark.trio
+async def test_run_agent_with_retries_charges_instructions_to_token_bucket(monkeypatch: pytest.MonkeyPatch):
+    charged: list[int] = []
+
+    class RecordingBucket:
+        async def acquire(self, tokens: int) -> None:
+            charged.append(tokens)
+
+    monkeypatch.setattr(retry, 'get_token_bucket', RecordingBucket)
+
+    agent = FlakyAgent([])
+
+    assert await run_agent_with_retries(agent, 'u' * 40, instructions='s' * 400) == 'U' * 40  # type: ignore[arg-type]
+    assert charged == [110]